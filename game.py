@@ -2,21 +2,42 @@ import math
 import os
 import random
 import sys
+import time
+import numpy as np
 import pygame
 
 
-from scripts.particle import Particle
-from scripts.spark import Spark
-from scripts.utils import load_image, load_images, Animation
+from scripts.particle import DEFAULT_MAX_PARTICLES, ParticleSystem
+from scripts.spark import SparkField
+from scripts.outline import Outline
+from scripts.transforms import TransformCache
+from scripts.assets import AssetRegistry, load_manifest
 from scripts.entities import Player, Enemy, Boss
-from scripts.ui import HealthBar
+from scripts.ui import HealthBar, get_font, overlay_surface, render_text
 from scripts.tilemap import Tilemap
+from scripts.mapformat import MAP_EXT
+from scripts.levels import LevelLoader
+from scripts.spatial import Broadphase
+from scripts.projectiles import ProjectileSystem
 from scripts.clouds import Clouds
+from scripts.headless import SilentSound, init_headless
+from scripts.replay import Recorder
+from scripts.profiler import FrameProfiler
+from scripts.present import Presenter
 from auth import login, register
 
+# the window contents were lost and have to be pushed in full again
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, getattr(pygame, 'WINDOWEXPOSED', pygame.VIDEOEXPOSE))
+
 class Game:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, headless=False):
+        # headless: no window, audio or frame pacing; the world is only advanced
+        # through simulate() (balance runs, regression checks, benchmarks)
+        self.headless = headless
+        if headless:
+            init_headless()
+        else:
+            pygame.init()
 
         # UI font that supports Vietnamese glyphs; fallback to default if not available
         try:
@@ -31,213 +52,63 @@ class Game:
         self.window = pygame.display.set_mode((640, 480))
         self.display = pygame.Surface((320, 240), pygame.SRCALPHA) # set viewport to half the resolution (pixel art)
         self.display_2 = pygame.Surface((320, 240))
+        # level transition mask, redrawn in place every transition frame
+        self.transition_surf = pygame.Surface(self.display.get_size())
+        self.transition_surf.set_colorkey((255, 255, 255)) # set it transparent by ignoring the white color
 
         screen = pygame.display.set_mode((800, 600))
         pygame.display.set_caption("Đăng nhập")
+        # scales display_2 onto the window, pushing only what changed
+        self.presenter = Presenter(self.window, self.display_2.get_size())
+        # set by input and by update(); a paused frame is only redrawn when it is set
+        self.needs_redraw = True
 
 
         # Init time (clock)
         self.clock = pygame.time.Clock()
+        # the simulation advances in fixed ticks (physics, timers and animations count ticks, so
+        # 60 keeps the original game speed); drawing is capped separately and interpolates between ticks
+        self.tick_rate = 60
+        self.max_fps = 120
+        # most ticks run to catch up after a slow frame before the backlog is dropped
+        self.max_ticks_per_frame = 5
+        self.interpolate = True
+        # ticks simulated since start_session; the gameplay RNG seed of that session
+        self.tick = 0
+        self.seed = None
+        # set to a scripts.replay.Recorder to capture input for a replay
+        self.recorder = None
+        # purely visual randomness (screenshake) stays off the gameplay RNG so replays match
+        self.fx_random = random.Random()
+        # per-phase frame timings; F2 toggles it and its overlay, F4 exports what it kept
+        self.profiler = FrameProfiler()
 
         """
         LOAD ASSETS
         """
-        self.assets = {
-            'decor': load_images('tiles/decor'),
-            'grass': load_images('tiles/grass'),
-            'large_decor': load_images('tiles/large_decor'),
-            'stone': load_images('tiles/stone'),
-            'player': load_image('entities/player.png'),
-            'background': load_image('background.png'),
-            'clouds': load_images('clouds'),
-            'enemy/idle': Animation(load_images('entities/enemy/idle'), img_dur=6),
-            'enemy/run': Animation(load_images('entities/enemy/run'), img_dur=4),
-            # boss assets
-            'boss/idle': None,
-            'boss/run': None,
-            'boss/attack': None,
-            'player/idle': Animation(load_images('entities/player/idle'), img_dur=6),
-            'player/run': Animation(load_images('entities/player/run'), img_dur=4),
-            'player/jump': Animation(load_images('entities/player/jump'), loop=False),
-            'player/slide': Animation(load_images('entities/player/slide')),
-            'player/wall_slide': Animation(load_images('entities/player/wall_slide')),
-            'particle/leaf': Animation(load_images('particles/leaf'), img_dur= 20,loop=False),
-            'particle/particle': Animation(load_images('particles/particle'), img_dur=6, loop=False),
-            'gun': load_image('gun.png'),
-            'projectile': load_image('projectile.png'),
-            'logo': None,
-            # optional item icons (user placed images in data/images/entities/player/items)
-            'item/kunai': None,
-            'item/shuriken': None,
-        }
-
-        # if user provided a background image for login/map, prefer it
-        try:
-            custom_bg = load_image('backgroundDNDK.jpg')
-            if custom_bg:
-                self.assets['background'] = custom_bg
-        except Exception:
-            pass
-
-        # try load logo image (use logogame.png in data/images root)
-        try:
-            logo_img = load_image('logogame.png')
-            if logo_img:
-                self.assets['logo'] = logo_img
-        except Exception:
-            self.assets['logo'] = None
-
-        # try to load item icons if files exist
-        try:
-            self.assets['item/kunai'] = load_image('entities/player/items/kunai.png')
-        except Exception:
-            self.assets['item/kunai'] = None
-        try:
-            self.assets['item/shuriken'] = load_image('entities/player/items/shuriken.png')
-        except Exception:
-            self.assets['item/shuriken'] = None
-
-        # load boss animations if available
-        print("Loading boss animations...")
-        # Try both lowercase and capitalized folder names
-        for idle_path in ['entities/boss/idle', 'entities/boss/Idle']:
-            try:
-                boss_idle = load_images(idle_path)
-                if boss_idle:
-                    self.assets['boss/idle'] = Animation(boss_idle, img_dur=8)
-                    print(f"Loaded boss/idle from {idle_path} with {len(boss_idle)} frames")
-                    break
-            except Exception as e:
-                print(f"Failed to load boss/idle from {idle_path}: {e}")
-                
-        for walk_path in ['entities/boss/walk', 'entities/boss/Walk']:
-            try:
-                boss_walk = load_images(walk_path)
-                if boss_walk:
-                    self.assets['boss/walk'] = Animation(boss_walk, img_dur=10)  # Slower walk
-                    print(f"Loaded boss/walk from {walk_path} with {len(boss_walk)} frames")
-                    break
-            except Exception as e:
-                print(f"Failed to load boss/walk from {walk_path}: {e}")
-            
-        try:
-            boss_attack1 = load_images('entities/boss/attack1')
-            if boss_attack1:
-                self.assets['boss/attack1'] = Animation(boss_attack1, img_dur=6, loop=False)  # Slower
-                print(f"Loaded boss/attack1 with {len(boss_attack1)} frames")
-            else:
-                print("No boss/attack1 images found")
-        except Exception as e:
-            print(f"Failed to load boss/attack1: {e}")
-            
-        try:
-            boss_attack2 = load_images('entities/boss/attack2')
-            if boss_attack2:
-                self.assets['boss/attack2'] = Animation(boss_attack2, img_dur=6, loop=False)  # Slower
-                print(f"Loaded boss/attack2 with {len(boss_attack2)} frames")
-            else:
-                print("No boss/attack2 images found")
-        except Exception as e:
-            print(f"Failed to load boss/attack2: {e}")
-            
-        for hurt_path in ['entities/boss/hurt', 'entities/boss/Hurt']:
-            try:
-                boss_hurt = load_images(hurt_path)
-                if boss_hurt:
-                    self.assets['boss/hurt'] = Animation(boss_hurt, img_dur=3, loop=False)
-                    print(f"Loaded boss/hurt from {hurt_path} with {len(boss_hurt)} frames")
-                    break
-            except Exception as e:
-                print(f"Failed to load boss/hurt from {hurt_path}: {e}")
-            
-        print("Boss animation loading complete.")
-
-        # attempt to load alternate player character assets (ninja, samurai) if present
-        # automatically discover character folders under data/images/entities
-        self.character_dirs = {}  # map asset_prefix -> dir_name
         # per-character scale multipliers (applied relative to default player height)
-        # increase samurai a bit so it looks larger than default after scaling
         self.character_scales = {
             'player_ninja': 1.0,
         }
-    # reference collision height (pixels) used by default player animations
-    # The default Player is created with size (8, 15) below; keep this in sync
-        try:
-            ent_path = os.path.join('data', 'images', 'entities')
-            for entry in sorted(os.listdir(ent_path)):
-                full = os.path.join(ent_path, entry)
-                if not os.path.isdir(full):
-                    continue
-                if entry.lower() in ('player', 'enemy', 'boss'):
-                    continue
-                # no special-case folders during discovery
-                # create an asset prefix from folder name
-                prefix = 'player_' + entry.lower()
-                self.character_dirs[prefix] = entry
-                # expected animation names (include attack/hurt if provided)
-                actions = ['idle', 'run', 'jump', 'slide', 'wall_slide', 'attack', 'hurt']
-                # find subdirs case-insensitively
-                subs = {d.lower(): d for d in os.listdir(full) if os.path.isdir(os.path.join(full, d))}
-                for act in actions:
-                    if act in subs:
-                        subdir = subs[act]
-                        try:
-                            imgs = load_images(f'entities/{entry}/{subdir}')
-                            # if default player idle animation exists, scale this character's images
-                            try:
-                                default_idle = None
-                                if 'player/idle' in self.assets and hasattr(self.assets['player/idle'], 'images'):
-                                    default_idle = self.assets['player/idle'].images[0]
-                                if default_idle is not None and imgs:
-                                    # apply per-character scale multiplier
-                                    mult = self.character_scales.get(prefix, 1.0)
-                                    target_h = max(1, int(default_idle.get_height() * mult))
-                                    scaled = []
-                                    for im in imgs:
-                                        if im.get_height() != target_h:
-                                            new_w = int(im.get_width() * (target_h / im.get_height()))
-                                            scaled.append(pygame.transform.scale(im, (new_w, target_h)))
-                                        else:
-                                            scaled.append(im)
-                                    imgs = scaled
-                            except Exception:
-                                pass
-                            # make attack/hurt/jump non-looping so they finish and don't lock the player
-                            is_loop = not (act in ('attack', 'hurt', 'jump'))
-                            self.assets[f'{prefix}/{act}'] = Animation(imgs, img_dur=6 if act == 'idle' else 4, loop=is_loop)
-                        except Exception:
-                            pass
-                
-                # ensure all characters have basic animations by copying from idle if missing
-                if f'{prefix}/idle' in self.assets:
-                    base_idle = self.assets[f'{prefix}/idle']
-                    for required_action in ['wall_slide', 'jump', 'run']:
-                        if f'{prefix}/{required_action}' not in self.assets:
-                            try:
-                                # copy idle animation but adjust img_dur and loop for the action
-                                is_loop = not (required_action in ('attack', 'hurt', 'jump'))
-                                self.assets[f'{prefix}/{required_action}'] = Animation(
-                                    base_idle.images, 
-                                    img_dur=4, 
-                                    loop=is_loop
-                                )
-                            except Exception:
-                                pass
-        except Exception:
-            # discovery is best-effort
-            pass
+        # every key is listed in a generated manifest (tools/build_manifest.py); the
+        # art behind a key is only loaded the first time it is used
+        manifest = load_manifest()
+        self.assets = AssetRegistry(manifest, scales=self.character_scales)
+        # map asset_prefix -> dir_name for the alternate characters found under data/images/entities
+        self.character_dirs = dict(manifest.get('characters', {}))
 
         """
         SOUNDS
         """
+        Sound = SilentSound if headless else pygame.mixer.Sound
         self.sfx = {
-            'jump': pygame.mixer.Sound('data/sfx/jump.wav'),
-            'dash': pygame.mixer.Sound('data/sfx/dash.wav'),
-            'hit': pygame.mixer.Sound('data/sfx/hit.wav'),
-            'shoot': pygame.mixer.Sound('data/sfx/shoot.wav'),
+            'jump': Sound('data/sfx/jump.wav'),
+            'dash': Sound('data/sfx/dash.wav'),
+            'hit': Sound('data/sfx/hit.wav'),
+            'shoot': Sound('data/sfx/shoot.wav'),
             # optional knife sound for samuraicut melee
             'knife': None,
-            'ambience': pygame.mixer.Sound('data/sfx/ambience.wav'),
+            'ambience': Sound('data/sfx/ambience.wav'),
         }
 
         self.sfx['ambience'].set_volume(0.2)
@@ -247,7 +118,7 @@ class Game:
         self.sfx['jump'].set_volume(0.3)
         # load knife sound if provided by user (non-fatal if missing)
         try:
-            knife_sfx = pygame.mixer.Sound('data/sfx/knife.wav')
+            knife_sfx = Sound('data/sfx/knife.wav')
             if knife_sfx:
                 self.sfx['knife'] = knife_sfx
                 try:
@@ -263,7 +134,7 @@ class Game:
         OR LOAD IT IN THE PLAYER SCRIPT (BETTER SOLUTION IMO)
         """
 
-        self.clouds = Clouds(self.assets['clouds'], count=16)
+        self.clouds = Clouds(self.assets['clouds'], count=16, layers=3)
         self.player = Player(self, (70,50), (8, 15))
         # HUD: health bar fixed to top-left of the screen
         self.hud = HealthBar(max_hits=self.player.max_hits, pos=(4,4), size=(60,12))
@@ -273,11 +144,26 @@ class Game:
 
         # pickups on the map (list of dict: {'type': 'shuriken'|'kunai', 'pos': [x,y]})
         self.pickups = []
+        # per-tick spatial hash for enemy/pickup hit checks (rebuilt in update)
+        self.broadphase = Broadphase(cell_size=32)
+        # (system, mask) kills found in the last tick, applied at the start of the next one
+        self.pending_kills = []
+        self.projectiles = ProjectileSystem()
+        self.particles = ParticleSystem(self, max_particles=DEFAULT_MAX_PARTICLES)
+        self.sparks = SparkField()
+        self.outline = Outline(self.display.get_size())
+        self.transforms = TransformCache()
 
         self.tilemap = Tilemap(self, tile_size=16)
         # build a stable, sorted list of JSON map files (numerical order when possible)
         map_dir = os.path.join('data', 'maps')
         files = [f for f in os.listdir(map_dir) if f.lower().endswith('.json')]
+        # prefer a converted binary map (tools/convert_maps.py) when it is not older than the JSON
+        for i, fn in enumerate(files):
+            bin_fn = os.path.splitext(fn)[0] + MAP_EXT
+            bin_path = os.path.join(map_dir, bin_fn)
+            if os.path.exists(bin_path) and os.path.getmtime(bin_path) >= os.path.getmtime(os.path.join(map_dir, fn)):
+                files[i] = bin_fn
         def _map_sort_key(fn):
             name = os.path.splitext(fn)[0]
             try:
@@ -286,6 +172,7 @@ class Game:
                 return name
         files.sort(key=_map_sort_key)
         self.map_files = files
+        self.level_loader = LevelLoader(self, self.map_files, map_dir)
 
         self.level = 0
         # clamp level and load first level (load_level handles errors)
@@ -305,35 +192,30 @@ class Game:
         and avoids counting non-json files. If loading fails (invalid JSON,
         etc.) the function will log the error and fall back to an empty map
         so the game can continue instead of crashing.
+
+        Maps are parsed ahead of time by `self.level_loader`; after a swap
+        the same map (for respawns) and the next one are queued again.
         """
         # ensure we have a files list
         if not hasattr(self, 'map_files') or not self.map_files:
             # nothing to load
-            self.tilemap.tilemap = {}
-            self.tilemap.offgrid_tiles = []
+            self.tilemap.clear()
             return
 
         # clamp the index
         map_index = max(0, min(map_index, len(self.map_files) - 1))
-        map_path = os.path.join('data', 'maps', self.map_files[map_index])
-        try:
-            self.tilemap.load(map_path)
-        except Exception as e:
-            print(f"Failed to load map '{map_path}': {e}")
-            # fallback to an empty map so the game won't crash; user can fix the JSON
-            self.tilemap.tilemap = {}
-            self.tilemap.offgrid_tiles = []
-
-        self.leaf_spawners = []
-        for tree in self.tilemap.extract([('large_decor', 2)], keep=True):
-            self.leaf_spawners.append(pygame.Rect(4 + tree['pos'][0], 4 + tree['pos'][1], 23, 13))
+        # normally already parsed on the loader thread (see scripts/levels.py)
+        level = self.level_loader.take(map_index)
+        self.tilemap = level.tilemap
+        # prepared without touching surfaces; sizing the off-grid tiles loads their images
+        self.tilemap.rebuild_offgrid_index()
+        self.leaf_spawners = level.leaf_spawners
 
         self.enemies = []
         self.boss = None
         self.boss_defeated = False
         self.return_to_character_select = False
-        # include variant 2 for boss spawners
-        for spawner in self.tilemap.extract([('spawners', 0), ('spawners', 1), ('spawners', 2)]):
+        for spawner in level.spawners:
             if spawner['variant'] == 0:
                 self.player.pos = spawner['pos']
                 self.player.air_time = 0
@@ -359,57 +241,141 @@ class Game:
                     # fallback to normal enemy if Boss construction fails
                     self.enemies.append(Enemy(self, spawner['pos'], (8, 15)))
 
-        # extract item pickups from map. Variant mapping:
-        # 0 -> shuriken pickup, 1 -> kunai pickup
-        self.pickups = []
-        for it in self.tilemap.extract([('items', 0), ('items', 1)], keep=False):
-            if it['variant'] == 0:
-                self.pickups.append({'type': 'shuriken', 'pos': it['pos']})
-            elif it['variant'] == 1:
-                self.pickups.append({'type': 'kunai', 'pos': it['pos']})
-
-        # spawn a few random pickups on the map (where not solid)
-        try:
-            xs = []
-            ys = []
-            for loc, tile in self.tilemap.tilemap.items():
-                pos = tile.get('pos')
-                if pos:
-                    xs.append(int(pos[0] * self.tilemap.tile_size))
-                    ys.append(int(pos[1] * self.tilemap.tile_size))
-            for off in self.tilemap.offgrid_tiles:
-                if 'pos' in off:
-                    xs.append(int(off['pos'][0]))
-                    ys.append(int(off['pos'][1]))
-            if xs and ys:
-                minx, maxx = min(xs), max(xs)
-                miny, maxy = min(ys), max(ys)
-            else:
-                minx, maxx = 0, self.display.get_width()
-                miny, maxy = 0, self.display.get_height()
-
-            # spawn 2-5 pickups randomly
-            for _ in range(random.randint(2, 5)):
-                attempts = 0
-                while attempts < 50:
-                    rx = random.randint(minx, maxx)
-                    ry = random.randint(miny, maxy)
-                    # avoid solid tiles
-                    if not self.tilemap.solid_check((rx, ry)):
-                        self.pickups.append({'type': random.choice(['shuriken', 'kunai']), 'pos': [rx, ry]})
-                        break
-                    attempts += 1
-        except Exception:
-            pass
-
-        self.projectiles = []
-        self.particles = []
-        self.sparks = []
+        self.pickups = level.pickups
+        self.rebuild_broadphase()
+
+        # get a fresh copy of this map ready for a respawn, and the next map for the transition;
+        # anything else still prepared (e.g. after a level skip) is dropped
+        for index in list(self.level_loader.pending):
+            if index not in (map_index, map_index + 1):
+                self.level_loader.discard(index)
+        self.level_loader.request(map_index)
+        self.level_loader.request(map_index + 1)
+
+        self.projectiles.clear()
+        self.particles.clear()
+        self.sparks.clear()
+        self.pending_kills = []
+        # the new level is what gets drawn until the next tick runs; nothing to interpolate from
+        self.visible_enemies = self.enemies.copy()
+        self.visible_boss = self.boss
+        self.visible_pickups = list(self.pickups)
+        self.player_visible = True
+        self.player.prev_pos = None
+        self.prev_scroll = None
 
         self.scroll = [0, 0]
         self.dead = 0
         self.transition = -30
     
+    def start_session(self, seed=None):
+        """Seed the gameplay RNG and restart the current level from tick 0.
+
+        Everything the simulation draws from `random` then follows from the
+        seed and the input, which is what scripts/replay.py records.
+        """
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        random.seed(self.seed)
+        # levels queued before seeding would bring pickups from the old RNG state
+        self.level_loader.reset()
+        self.tick = 0
+        self.movement = [False, False]
+        self.paused = False
+        self.screenshake = 0
+        self.load_level(self.level)
+        return self.seed
+
+    def pickup_rect(self, pu, icon_size=12):
+        return pygame.Rect(pu['pos'][0] - icon_size // 2, pu['pos'][1] - icon_size // 2, icon_size, icon_size)
+
+    def rebuild_broadphase(self):
+        """Register this tick's enemies, boss and pickups for hit queries."""
+        self.broadphase.clear()
+        for enemy in self.enemies:
+            self.broadphase.add(enemy, enemy.rect(), 'enemy')
+        if self.boss:
+            self.broadphase.add(self.boss, self.boss.rect(), 'boss')
+        for pu in self.pickups:
+            self.broadphase.add(pu, self.pickup_rect(pu), 'pickup')
+
+    def update_projectiles(self):
+        """Advance and resolve every projectile for this tick.
+
+        Movement and the tile/lifetime/player tests run over the whole batch
+        at once. Enemies are found through the broadphase, one cell lookup
+        per projectile, so the cost follows the projectile/enemy pairs that
+        are actually close rather than projectiles x enemies. Only
+        projectiles that hit something fall through to the per-item handling
+        below (effects, damage). Dead
+        projectiles are removed at the start of the next tick, after render()
+        has drawn them once more.
+        """
+        projectiles = self.projectiles
+        projectiles.update()
+        if not len(projectiles):
+            return
+
+        broadphase = self.broadphase
+        # Rect.collidepoint truncates float coordinates toward zero; the cell lookup must agree
+        points = [tuple(p) for p in np.trunc(projectiles.pos[:len(projectiles)]).astype(int).tolist()]
+        hit_any = np.array([bool(broadphase.query_point(p, 'enemy')) for p in points], dtype=bool)
+        solid = projectiles.solid(self.tilemap)
+        expired = projectiles.expired()
+        if abs(self.player.dashing) < 50:
+            player_hit = projectiles.hit_matrix([self.player.rect()])[:, 0]
+        else:
+            player_hit = np.zeros(len(projectiles), dtype=bool)
+        dead_mask = hit_any | solid | expired | player_hit
+
+        for i in np.flatnonzero(dead_mask):
+            pos = projectiles.pos[i].tolist()
+            # check collision with enemies (killed ones have left the broadphase already)
+            hit_enemy = None
+            if hit_any[i]:
+                hits = broadphase.query_point(points[i], 'enemy')
+                if hits:
+                    hit_enemy = hits[0]
+            if hit_enemy:
+                # delegate hit handling to the enemy (Boss can take multiple hits)
+                dead = True
+                try:
+                    if hasattr(hit_enemy, 'take_hit'):
+                        dead = hit_enemy.take_hit()
+                    else:
+                        dead = True
+                except Exception:
+                    dead = True
+                # projectile is removed regardless
+                if dead:
+                    broadphase.remove(hit_enemy)
+                    try:
+                        self.enemies.remove(hit_enemy)
+                    except Exception:
+                        pass
+                    # spawn hit effects for death
+                    for _ in range(20):
+                        angle = random.random() * math.pi * 2
+                        speed = random.random() * 5
+                        self.sparks.spawn(hit_enemy.rect().center, angle, 2 + random.random())
+                        self.particles.spawn('particle', hit_enemy.rect().center, velocity=[math.cos(angle + math.pi) * speed * 0.5, math.sin(angle + math.pi) * speed * 0.5], frame=random.randint(0,7))
+                    try:
+                        self.sfx['hit'].play()
+                    except Exception:
+                        pass
+                continue
+            if solid[i]:
+                for _ in range(4):
+                    self.sparks.spawn(pos, random.random() - 0.5 + (math.pi if projectiles.vel[i, 0] > 0 else 0), 2 + random.random())
+            elif expired[i]:
+                pass
+            elif player_hit[i]:
+                # delegate hit handling to player (tracks hits and triggers death at max hits)
+                self.player.take_hit()
+            else:
+                # its only enemy was killed by an earlier projectile this tick; keep flying
+                dead_mask[i] = False
+        self.pending_kills.append((projectiles, dead_mask))
+
     def text_input(self, screen, prompt, pos=None, password=False):
         """Improved text input that supports Unicode (Vietnamese), password masking and a caret.
 
@@ -421,7 +387,7 @@ class Game:
         Returns:
             The entered text (unicode)
         """
-        font = getattr(self, 'ui_font', None) or pygame.font.Font(None, 28)
+        font = getattr(self, 'ui_font', None) or get_font(28)
         clock = pygame.time.Clock()
         text = ''
         active = True
@@ -464,16 +430,14 @@ class Game:
                             text += ch
 
             # draw input overlay
-            overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 180))
-            screen.blit(overlay, (0, 0))
+            screen.blit(overlay_surface(screen.get_size(), (0, 0, 0, 180)), (0, 0))
 
             # box
             pygame.draw.rect(screen, (40, 40, 40), (box_x - 8, box_y - 8, box_w + 16, box_h + 16), border_radius=6)
             pygame.draw.rect(screen, (20, 20, 20), (box_x - 6, box_y - 6, box_w + 12, box_h + 12), border_radius=6)
 
             # prompt
-            prompt_surf = font.render(prompt, True, (255, 255, 255))
+            prompt_surf = render_text(font, prompt, True, (255, 255, 255))
             screen.blit(prompt_surf, (box_x + 8, box_y - prompt_surf.get_height() - 6))
 
             # input text (mask if password)
@@ -482,7 +446,7 @@ class Game:
             if caret_visible:
                 display_text += '_'
 
-            txt_surf = font.render(display_text, True, (230, 230, 230))
+            txt_surf = render_text(font, display_text, True, (230, 230, 230))
             # clip if too long
             if txt_surf.get_width() > box_w - 16:
                 # show tail
@@ -494,7 +458,7 @@ class Game:
                     display_text = '*' * len(visible) + ('_' if caret_visible else '')
                 else:
                     display_text = visible + ('_' if caret_visible else '')
-                txt_surf = font.render(display_text, True, (230, 230, 230))
+                txt_surf = render_text(font, display_text, True, (230, 230, 230))
 
             screen.blit(txt_surf, (box_x + 8, box_y + (box_h - txt_surf.get_height()) // 2))
 
@@ -503,17 +467,23 @@ class Game:
         return text
 
     def login_screen(self, screen):
+        # load the character previews in the background while the player logs in
+        self.assets.prefetch([prefix + '/idle' for prefix in self.character_dirs])
+
         # use UI font for consistent rendering (supports Vietnamese)
-        font = getattr(self, 'ui_font', pygame.font.Font(None, 48))
-        small_font = getattr(self, 'ui_font', pygame.font.Font(None, 36))
+        font = getattr(self, 'ui_font', None) or get_font(48)
+        small_font = getattr(self, 'ui_font', None) or get_font(36)
         message = ""  # dòng thông báo
+        # the menu is static between key presses; no need to redraw it faster than this
+        clock = pygame.time.Clock()
         
         while True:
+            clock.tick(60)
             screen.fill((20, 20, 20))
             
             # tiêu đề menu
             title_text = "1. Đăng nhập   2. Đăng ký"
-            title = font.render(title_text, True, (255, 255, 255))
+            title = render_text(font, title_text, True, (255, 255, 255))
             # center title
             tw, th = title.get_size()
             sw, sh = screen.get_size()
@@ -521,7 +491,7 @@ class Game:
 
             # hiển thị thông báo (nếu có)
             if message:
-                msg_surface = small_font.render(message, True, (255, 200, 0))
+                msg_surface = render_text(small_font, message, True, (255, 200, 0))
                 # center message under title
                 mw = msg_surface.get_width()
                 screen.blit(msg_surface, (sw//2 - mw//2, sh//2 - 80))
@@ -557,7 +527,7 @@ class Game:
         The menu is generated from discovered character folders under data/images/entities.
         If no extra characters are found, the menu will offer the default 'player' entry.
         """
-        font = getattr(self, 'ui_font', pygame.font.Font(None, 28))
+        font = getattr(self, 'ui_font', None) or get_font(28)
         title = "Chọn nhân vật"
         # build choices from discovered character directories
         choices = []
@@ -570,10 +540,12 @@ class Game:
                 choices.append((label, prefix))
         except Exception:
             pass
+        clock = pygame.time.Clock()
 
         while True:
+            clock.tick(60)
             screen.fill((20, 20, 20))
-            tw = font.render(title, True, (255, 255, 255))
+            tw = render_text(font, title, True, (255, 255, 255))
             sw, sh = screen.get_size()
             screen.blit(tw, (sw//2 - tw.get_width()//2, sh//2 - 120))
 
@@ -601,17 +573,17 @@ class Game:
                         # scale preview to fit height
                         ph = btn_h - 8
                         pw = int(img.get_width() * (ph / img.get_height()))
-                        preview = pygame.transform.scale(img, (pw, ph))
+                        preview = self.transforms.get(img, size=(pw, ph))
                         screen.blit(preview, (rect.x + 6, rect.y + 4))
                         # shift label right
-                        lbl = btn_font.render(label, True, (255, 255, 255))
+                        lbl = render_text(btn_font, label, True, (255, 255, 255))
                         screen.blit(lbl, (rect.x + 12 + pw, rect.y + (btn_h - lbl.get_height()) // 2))
                         preview_drawn = True
                 except Exception:
                     preview_drawn = False
 
                 if not preview_drawn:
-                    lbl = btn_font.render(label, True, (255, 255, 255))
+                    lbl = render_text(btn_font, label, True, (255, 255, 255))
                     screen.blit(lbl, (rect.x + (btn_w - lbl.get_width()) // 2, rect.y + (btn_h - lbl.get_height()) // 2))
 
             pygame.display.flip()
@@ -650,6 +622,8 @@ class Game:
             # fallback if assets missing
             if prefix + '/idle' not in self.assets:
                 prefix = 'player'
+            # the rest of the chosen character's animations are needed as soon as it moves
+            self.assets.prefetch(self.assets.keys_with_prefix(prefix + '/'))
 
             # create new player
             from scripts.entities import Player
@@ -668,10 +642,7 @@ class Game:
             try:
                 key = prefix + '/idle'
                 if key in self.assets:
-                    try:
-                        self.player.animation = self.assets[key].copy()
-                    except Exception:
-                        self.player.animation = self.assets[key]
+                    self.player.play(self.assets[key])
             except Exception:
                 pass
             # reset anim_offset to default (user will edit images manually)
@@ -683,10 +654,7 @@ class Game:
             try:
                 key = prefix + '/idle'
                 if key in self.assets:
-                    try:
-                        self.player.animation = self.assets[key].copy()
-                    except Exception:
-                        self.player.animation = self.assets[key]
+                    self.player.play(self.assets[key])
                     # adjust collision size to match visual asset height so wall_slide and
                     # other collision-based states align with the sprite dimensions
                     try:
@@ -775,422 +743,505 @@ class Game:
         self.sfx['ambience'].play(-1)
 
 
-        # Main loop
+        # Main loop: input every frame, the simulation in fixed ticks (update), then one draw (render).
+        # The accumulator starts a full step ahead so the first frame has a tick to show.
+        step = 1000 / self.tick_rate
+        accumulator = step
+        # the menus drew over the window since the last game frame
+        self.presenter.invalidate()
+        self.needs_redraw = True
         while True:
             # Check if we need to return to character select
             if self.return_to_character_select:
                 break
-            # clear logical display (pixel-art surface)
-            self.display.fill((0, 0, 0, 0))  # RGBA Color
 
-            # draw background if available, otherwise fill with a fallback color
-            bg = self.assets.get('background')
-            if bg:
-                try:
-                    self.display_2.blit(bg, (0, 0))
-                except Exception:
-                    self.display_2.fill((12, 18, 36))
-            else:
-                self.display_2.fill((12, 18, 36))
+            profiler = self.profiler
+            profiler.begin_frame()
 
             # --- event processing (do this early so ESC toggles pause immediately) ---
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()  # pygame only closes pygame
-                    sys.exit()  # exit the app
-
-                if event.type == pygame.KEYDOWN:
-                    # toggle pause
-                    if event.key == pygame.K_ESCAPE:
-                        self.paused = not self.paused
-                        # small audio hint when pausing/unpausing
-                        try:
-                            if self.paused:
-                                self.sfx.get('ambience', pygame.mixer.Sound('data/sfx/ambience.wav')).set_volume(0.1)
-                            else:
-                                self.sfx.get('ambience', pygame.mixer.Sound('data/sfx/ambience.wav')).set_volume(0.2)
-                        except Exception:
-                            pass
+            self.handle_events()
+            profiler.mark('events')
 
-                    if event.key == pygame.K_LEFT:
-                        self.movement[0] = True
-                    if event.key == pygame.K_RIGHT:
-                        self.movement[1] = True
-                    if event.key == pygame.K_UP:
-                        if self.player.jump():
-                            try:
-                                self.sfx['jump'].play()
-                            except Exception:
-                                pass
-                    if event.key == pygame.K_x:
-                        self.player.dash()
-                    # item usage keys
-                    if event.key == pygame.K_z:
-                        # primary attack (ranged or melee depending on chosen character)
-                        try:
-                            used = self.player.primary_attack()
-                        except Exception:
-                            used = False
-                        if not used:
-                            pass
-                    if event.key == pygame.K_c:
-                        try:
-                            used = self.player.use_kunai()
-                        except Exception:
-                            used = False
-                        if not used:
-                            pass
-                    # debug keys to give items (for testing/pickups)
-                    if event.key == pygame.K_9:
-                        self.player.give_item('shuriken', 10)
-                    if event.key == pygame.K_0:
-                        self.player.give_item('kunai', 10)
-                    # debug: spawn pickup at player position
-                    if event.key == pygame.K_p:
-                        pos = (self.player.rect().centerx, self.player.rect().centery)
-                        self.pickups.append({'type': 'shuriken', 'pos': [pos[0], pos[1]]})
-                    if event.key == pygame.K_o:
-                        pos = (self.player.rect().centerx, self.player.rect().centery)
-                        self.pickups.append({'type': 'kunai', 'pos': [pos[0], pos[1]]})
-                    # debug: jump to boss map (map 3)
-                    if event.key == pygame.K_F3:
-                        if len(self.map_files) > 3:  # ensure map 3 exists (3.json)
-                            self.level = 3
-                            self.load_level(self.level)
-                            self.transition = -30
-
-                if event.type == pygame.KEYUP:
-                    if event.key == pygame.K_LEFT:
-                        self.movement[0] = False
-                    if event.key == pygame.K_RIGHT:
-                        self.movement[1] = False
-                # handle mouse clicks while paused (map window -> display_2 coords)
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if self.paused and event.button == 1:
-                        # map mouse (window) coords into display_2 coordinates
-                        wx, wy = self.window.get_size()
-                        dx, dy = self.display_2.get_size()
-                        mx, my = event.pos
-                        # scale from window to logical display_2
-                        if wx and wy:
-                            sx = mx * (dx / wx)
-                            sy = my * (dy / wy)
+            # If paused, skip gameplay updates but still render the current frame and overlay
+            if self.paused:
+                accumulator = 0
+            else:
+                ticks = 0
+                while accumulator >= step and ticks < self.max_ticks_per_frame:
+                    self.update()
+                    accumulator -= step
+                    ticks += 1
+                # after a long stall drop the backlog instead of fast-forwarding through it
+                accumulator = min(accumulator, step)
+
+            # while paused nothing but input changes the picture, so an idle paused frame is skipped
+            if not self.paused or self.needs_redraw or self.profiler.enabled:
+                self.render(accumulator / step if self.interpolate else 1.0)
+            self.needs_redraw = False
+            accumulator += self.clock.tick(self.max_fps)
+            profiler.mark('wait')
+            profiler.end_frame()
+
+    def handle_events(self, events=None):
+        """Apply input events (pygame's queue by default) to the game state."""
+        for event in pygame.event.get() if events is None else events:
+            if self.recorder is not None:
+                self.recorder.capture(self.tick, event)
+            self.needs_redraw = True
+            if event.type in EXPOSE_EVENTS:
+                self.presenter.invalidate()
+            if event.type == pygame.QUIT:
+                pygame.quit()  # pygame only closes pygame
+                sys.exit()  # exit the app
+
+            if event.type == pygame.KEYDOWN:
+                # toggle pause
+                if event.key == pygame.K_ESCAPE:
+                    self.paused = not self.paused
+                    # small audio hint when pausing/unpausing
+                    try:
+                        if self.paused:
+                            self.sfx.get('ambience', pygame.mixer.Sound('data/sfx/ambience.wav')).set_volume(0.1)
                         else:
-                            sx, sy = mx, my
+                            self.sfx.get('ambience', pygame.mixer.Sound('data/sfx/ambience.wav')).set_volume(0.2)
+                    except Exception:
+                        pass
 
-                        # compute same button layout as drawn below
+                if event.key == pygame.K_LEFT:
+                    self.movement[0] = True
+                if event.key == pygame.K_RIGHT:
+                    self.movement[1] = True
+                if event.key == pygame.K_UP:
+                    if self.player.jump():
                         try:
-                            pause_font = getattr(self, 'ui_font', pygame.font.Font(None, 24))
-                            btn_w, btn_h = 120, 28
-                            spacing = 12
-                            center_x = dx // 2
-                            base_y = dy // 2 + 24
-                            play_rect = pygame.Rect(center_x - btn_w - spacing//2, base_y, btn_w, btn_h)
-                            exit_rect = pygame.Rect(center_x + spacing//2, base_y, btn_w, btn_h)
-                            if play_rect.collidepoint((sx, sy)):
-                                # return to character selection
-                                self.return_to_character_select = True
-                                self.paused = False
-                            if exit_rect.collidepoint((sx, sy)):
-                                pygame.quit()
-                                sys.exit()
+                            self.sfx['jump'].play()
                         except Exception:
                             pass
+                if event.key == pygame.K_x:
+                    self.player.dash()
+                # item usage keys
+                if event.key == pygame.K_z:
+                    # primary attack (ranged or melee depending on chosen character)
+                    try:
+                        used = self.player.primary_attack()
+                    except Exception:
+                        used = False
+                    if not used:
+                        pass
+                if event.key == pygame.K_c:
+                    try:
+                        used = self.player.use_kunai()
+                    except Exception:
+                        used = False
+                    if not used:
+                        pass
+                # debug keys to give items (for testing/pickups)
+                if event.key == pygame.K_9:
+                    self.player.give_item('shuriken', 10)
+                if event.key == pygame.K_0:
+                    self.player.give_item('kunai', 10)
+                # debug: spawn pickup at player position
+                if event.key == pygame.K_p:
+                    pos = (self.player.rect().centerx, self.player.rect().centery)
+                    self.pickups.append({'type': 'shuriken', 'pos': [pos[0], pos[1]]})
+                if event.key == pygame.K_o:
+                    pos = (self.player.rect().centerx, self.player.rect().centery)
+                    self.pickups.append({'type': 'kunai', 'pos': [pos[0], pos[1]]})
+                # debug: jump to boss map (map 3)
+                if event.key == pygame.K_F3:
+                    if len(self.map_files) > 3:  # ensure map 3 exists (3.json)
+                        self.level = 3
+                        self.load_level(self.level)
+                        self.transition = -30
+                # frame profiler overlay / export
+                if event.key == pygame.K_F2:
+                    self.profiler.toggle()
+                if event.key == pygame.K_F4 and self.profiler.frames:
+                    try:
+                        paths = self.profiler.export(time.strftime('profile_%Y%m%d_%H%M%S'))
+                        print(f"Frame profile written to {paths[0]} and {paths[1]}")
+                    except Exception as e:
+                        print(f"Failed to write frame profile: {e}")
+
+            if event.type == pygame.KEYUP:
+                if event.key == pygame.K_LEFT:
+                    self.movement[0] = False
+                if event.key == pygame.K_RIGHT:
+                    self.movement[1] = False
+            # handle mouse clicks while paused (map window -> display_2 coords)
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if self.paused and event.button == 1:
+                    # map mouse (window) coords into display_2 coordinates
+                    wx, wy = self.window.get_size()
+                    dx, dy = self.display_2.get_size()
+                    mx, my = event.pos
+                    # scale from window to logical display_2
+                    if wx and wy:
+                        sx = mx * (dx / wx)
+                        sy = my * (dy / wy)
+                    else:
+                        sx, sy = mx, my
 
-            # If paused, skip gameplay updates but still render the current frame and overlay
-            if not self.paused:
-                self.screenshake = max(0, self.screenshake - 1)
+                    # compute same button layout as drawn below
+                    try:
+                        pause_font = getattr(self, 'ui_font', None) or get_font(24)
+                        btn_w, btn_h = 120, 28
+                        spacing = 12
+                        center_x = dx // 2
+                        base_y = dy // 2 + 24
+                        play_rect = pygame.Rect(center_x - btn_w - spacing//2, base_y, btn_w, btn_h)
+                        exit_rect = pygame.Rect(center_x + spacing//2, base_y, btn_w, btn_h)
+                        if play_rect.collidepoint((sx, sy)):
+                            # return to character selection
+                            self.return_to_character_select = True
+                            self.paused = False
+                        if exit_rect.collidepoint((sx, sy)):
+                            pygame.quit()
+                            sys.exit()
+                    except Exception:
+                        pass
 
-                # Check if all enemies AND boss are defeated
-                all_enemies_dead = not len(self.enemies)
-                boss_dead = self.boss is None
-                
-                if all_enemies_dead and (boss_dead or self.boss is None):
-                    self.transition += 1
-                    if self.transition > 30:
-                        # advance to next map using the precomputed json list
-                        if hasattr(self, 'map_files') and self.map_files:
-                            self.level = min(self.level + 1, len(self.map_files) - 1)
-                        else:
-                            self.level = self.level + 1
-                        self.load_level(self.level)
-                if self.transition < 0:
-                    self.transition += 1
-
-                if self.dead:
-                    self.dead += 1
-                    if self.dead >= 10:
-                        self.transition = min(30, self.transition + 1)
-                    if self.dead > 40:
-                        self.load_level(self.level)
 
-                self.scroll[0] += (self.player.rect().centerx - self.display.get_width() / 2 - self.scroll[0]) / 30
-                self.scroll[1] += (self.player.rect().centery - self.display.get_height() / 2 - self.scroll[1]) / 30
-                render_scroll = (int(self.scroll[0]), int(self.scroll[1]))
+    def update(self):
+        """Advance the simulation by one fixed tick. Nothing is drawn here.
+
+        Entities, projectiles, sparks and particles that die during a tick
+        are still drawn by the following render(), as when each entity was
+        drawn right after its own update. The visible_* snapshots and
+        pending_kills exist for this, and pending_kills is applied at the
+        start of the next tick.
+        """
+        # counted first, so animations started during this tick begin on it
+        self.tick += 1
+        for system, mask in self.pending_kills:
+            system.kill(mask)
+        self.pending_kills = []
+
+        # where things were when this tick started, for interpolated rendering
+        self.prev_scroll = list(self.scroll)
+        for entity in [self.player] + self.enemies + ([self.boss] if self.boss else []):
+            entity.prev_pos = list(entity.pos)
+
+        self.screenshake = max(0, self.screenshake - 1)
+
+        # Check if all enemies AND boss are defeated
+        all_enemies_dead = not len(self.enemies)
+        boss_dead = self.boss is None
+        
+        if all_enemies_dead and (boss_dead or self.boss is None):
+            self.transition += 1
+            if self.transition > 30:
+                # advance to next map using the precomputed json list
+                if hasattr(self, 'map_files') and self.map_files:
+                    self.level = min(self.level + 1, len(self.map_files) - 1)
+                else:
+                    self.level = self.level + 1
+                self.load_level(self.level)
+        if self.transition < 0:
+            self.transition += 1
+
+        if self.dead:
+            self.dead += 1
+            if self.dead >= 10:
+                self.transition = min(30, self.transition + 1)
+            if self.dead > 40:
+                self.load_level(self.level)
+
+        self.scroll[0] += (self.player.rect().centerx - self.display.get_width() / 2 - self.scroll[0]) / 30
+        self.scroll[1] += (self.player.rect().centery - self.display.get_height() / 2 - self.scroll[1]) / 30
+
+        for rect in self.leaf_spawners:
+            if random.random() * 49999 < rect.width * rect.height:
+                pos = (rect.x + random.random() * rect.width, rect.y + random.random() * rect.height)
+                self.particles.spawn('leaf', pos, velocity=[-0.1, 0.3], frame=random.randint(0, 20))
+
+        self.clouds.update()
+        profiler = self.profiler
+        profiler.mark('update.world')
+
+        # Update regular enemies
+        self.visible_enemies = self.enemies.copy()
+        for enemy in self.visible_enemies:
+            kill = enemy.update(self.tilemap, (0, 0))
+            if kill:
+                try:
+                    self.enemies.remove(enemy)
+                except Exception:
+                    pass
+
+        # Update boss separately
+        self.visible_boss = self.boss
+        if self.boss:
+            boss_killed = self.boss.update(self.tilemap, (0, 0))
+            if boss_killed:
+                self.boss = None  # Boss defeated
+
+        # enemies are done moving for this tick; index them for the hit checks below
+        self.rebuild_broadphase()
+        profiler.mark('update.enemies')
+
+        self.player_visible = not self.dead
+        if not self.dead:
+            self.player.update(self.tilemap, (self.movement[1] - self.movement[0], 0))
+            profiler.mark('update.player')
+            self.visible_pickups = list(self.pickups)
+
+            # pickup collision in world coords (only pickups near the player)
+            for pu in self.broadphase.query_rect(self.player.rect(), 'pickup'):
+                # give the item to player
+                if pu['type'] == 'shuriken':
+                    self.player.give_item('shuriken', 1)
+                elif pu['type'] == 'kunai':
+                    self.player.give_item('kunai', 1)
+                try:
+                    self.sfx['shoot'].play()
+                except Exception:
+                    pass
+                self.broadphase.remove(pu)
+                try:
+                    self.pickups.remove(pu)
+                except Exception:
+                    pass
 
-                for rect in self.leaf_spawners:
-                    if random.random() * 49999 < rect.width * rect.height:
-                        pos = (rect.x + random.random() * rect.width, rect.y + random.random() * rect.height)
-                        self.particles.append(Particle(self, 'leaf', pos, velocity=[-0.1, 0.3], frame=random.randint(0, 20)))
+        else:
+            self.visible_pickups = []
 
-                self.clouds.update()
-                self.clouds.render(self.display, offset=render_scroll)
+        profiler.mark('update.pickups')
 
-                self.tilemap.render(self.display, offset=render_scroll)
+        self.update_projectiles()
+        profiler.mark('update.projectiles')
+        self.pending_kills.append((self.sparks, self.sparks.update()))
+        profiler.mark('update.sparks')
+        # particles are pooled and stepped in batch (scripts/particle.py)
+        self.pending_kills.append((self.particles, self.particles.update()))
+        profiler.mark('update.particles')
 
-                # Update regular enemies
-                for enemy in self.enemies.copy():
-                    kill = enemy.update(self.tilemap, (0, 0))
-                    enemy.render(self.display, offset=render_scroll)
-                    if kill:
-                        try:
-                            self.enemies.remove(enemy)
-                        except Exception:
-                            pass
+        self.needs_redraw = True
+        if self.recorder is not None:
+            self.recorder.after_tick(self)
 
-                # Update boss separately
-                if self.boss:
-                    boss_killed = self.boss.update(self.tilemap, (0, 0))
-                    self.boss.render(self.display, offset=render_scroll)
-                    if boss_killed:
-                        self.boss = None  # Boss defeated
-
-                if not self.dead:
-                    self.player.update(self.tilemap, (self.movement[1] - self.movement[0], 0))
-                    self.player.render(self.display, offset=render_scroll)
-
-                    # render pickups in the world and check for pickup collision
-                    for pu in self.pickups.copy():
-                        px, py = pu['pos']
-                        # draw icon smaller than player
-                        icon_size = 12
-                        img = None
-                        if pu['type'] == 'kunai':
-                            img = self.assets.get('item/kunai')
-                        elif pu['type'] == 'shuriken':
-                            img = self.assets.get('item/shuriken')
-
-                        draw_x = int(px - icon_size // 2 - render_scroll[0])
-                        draw_y = int(py - icon_size // 2 - render_scroll[1])
-                        if img:
-                            try:
-                                surf_img = pygame.transform.scale(img, (icon_size, icon_size))
-                                self.display.blit(surf_img, (draw_x, draw_y))
-                            except Exception:
-                                pygame.draw.rect(self.display, (255, 255, 0), (draw_x, draw_y, icon_size, icon_size))
-                        else:
-                            pygame.draw.rect(self.display, (255, 255, 0), (draw_x, draw_y, icon_size, icon_size))
-
-                        # collision check in world coords
-                        pickup_rect = pygame.Rect(px - icon_size // 2, py - icon_size // 2, icon_size, icon_size)
-                        if pickup_rect.colliderect(self.player.rect()):
-                            # give the item to player
-                            if pu['type'] == 'shuriken':
-                                self.player.give_item('shuriken', 1)
-                            elif pu['type'] == 'kunai':
-                                self.player.give_item('kunai', 1)
-                            try:
-                                self.sfx['shoot'].play()
-                            except Exception:
-                                pass
-                            try:
-                                self.pickups.remove(pu)
-                            except Exception:
-                                pass
+    def simulate(self, ticks, inputs=None):
+        """Run up to ticks updates as fast as possible, with no drawing, audio or clock.
 
-                # [[x,y], direction, timer]
-                for projectile in self.projectiles.copy():
-                    projectile[0][0] += projectile[1]
-                    projectile[2] += 1
-                    img = self.assets['projectile']
+        inputs is {tick: [events]} (see scripts/headless.py) or a callable
+        tick -> events, fed through handle_events before that tick's update.
+        Stops early when the game asks to return to character select.
+        Returns the number of ticks run.
+        """
+        for tick in range(ticks):
+            if self.return_to_character_select:
+                return tick
+            events = inputs(tick) if callable(inputs) else (inputs or {}).get(tick)
+            if events:
+                self.handle_events(events)
+            # a scripted ESC pauses the world just like in run()
+            if not self.paused:
+                self.profiler.begin_frame()
+                self.update()
+                self.profiler.end_frame()
+        return ticks
+
+    def interpolated(self, pos, prev, alpha):
+        if prev is None:
+            return pos
+        return (prev[0] + (pos[0] - prev[0]) * alpha, prev[1] + (pos[1] - prev[1]) * alpha)
+
+    def entity_offset(self, entity, render_scroll, alpha):
+        """Camera offset that draws entity at its interpolated position (entities draw at pos - offset)."""
+        x, y = self.interpolated(entity.pos, getattr(entity, 'prev_pos', None), alpha)
+        return (render_scroll[0] + entity.pos[0] - x, render_scroll[1] + entity.pos[1] - y)
+
+    def background_layer(self):
+        """The background composited once onto an opaque display-sized surface.
+
+        Drawing it each frame is then a plain copy (no colorkey test) that
+        also clears whatever the last frame left on display_2.
+        """
+        bg = self.assets.get('background')
+        cached = getattr(self, 'background_cache', None)
+        if cached is None or cached[0] is not bg:
+            layer = pygame.Surface(self.display_2.get_size()).convert()
+            layer.fill((12, 18, 36))
+            if bg:
+                try:
+                    # the loader gives it a black colorkey; the sky should cover black too
+                    src = bg.copy()
+                    src.set_colorkey(None)
+                    layer.blit(src, (0, 0))
+                except Exception:
+                    pass
+            cached = self.background_cache = (bg, layer)
+        return cached[1]
+
+    def render(self, alpha=1.0):
+        """Draw the state left by the last update(); alpha in [0, 1] blends from the tick before it."""
+        # clear logical display (pixel-art surface)
+        self.display.fill((0, 0, 0, 0))  # RGBA Color
+
+        # draw background if available, otherwise fill with a fallback color
+        self.display_2.blit(self.background_layer(), (0, 0))
+        profiler = self.profiler
+        profiler.mark('render.background')
+
+        if not self.paused:
+            scroll = self.interpolated(self.scroll, self.prev_scroll, alpha)
+            render_scroll = (int(scroll[0]), int(scroll[1]))
+
+            # every world sprite drawn below also adds its silhouette to the outline layer
+            self.outline.clear()
+            self.clouds.render(self.display, offset=render_scroll, outline=self.outline)
+            profiler.mark('render.clouds')
+
+            self.tilemap.render(self.display, offset=render_scroll, outline=self.outline)
+            profiler.mark('render.tilemap')
+
+            for enemy in self.visible_enemies:
+                enemy.render(self.display, offset=self.entity_offset(enemy, render_scroll, alpha), outline=self.outline)
+            if self.visible_boss:
+                self.visible_boss.render(self.display, offset=self.entity_offset(self.visible_boss, render_scroll, alpha), outline=self.outline)
+
+            if self.player_visible:
+                self.player.render(self.display, offset=self.entity_offset(self.player, render_scroll, alpha), outline=self.outline)
+            profiler.mark('render.entities')
+
+            # render pickups in the world
+            for pu in self.visible_pickups:
+                px, py = pu['pos']
+                # draw icon smaller than player
+                icon_size = 12
+                img = None
+                if pu['type'] == 'kunai':
+                    img = self.assets.get('item/kunai')
+                elif pu['type'] == 'shuriken':
+                    img = self.assets.get('item/shuriken')
+
+                draw_x = int(px - icon_size // 2 - render_scroll[0])
+                draw_y = int(py - icon_size // 2 - render_scroll[1])
+                if img:
                     try:
-                        self.display.blit(img, (projectile[0][0] - img.get_width() / 2 - render_scroll[0], projectile[0][1] - img.get_height() / 2 - render_scroll[1]))
+                        surf_img = self.transforms.get(img, size=(icon_size, icon_size))
+                        self.display.blit(surf_img, (draw_x, draw_y))
+                        self.outline.add(surf_img, (draw_x, draw_y))
                     except Exception:
-                        pass
-                    # check collision with enemies
-                    hit_enemy = None
-                    for enemy in self.enemies.copy():
-                        if enemy.rect().collidepoint(projectile[0]):
-                            hit_enemy = enemy
-                            break
-                    if hit_enemy:
-                            # delegate hit handling to the enemy (Boss can take multiple hits)
-                            dead = True
-                            try:
-                                if hasattr(hit_enemy, 'take_hit'):
-                                    dead = hit_enemy.take_hit()
-                                else:
-                                    dead = True
-                            except Exception:
-                                dead = True
-                            # remove projectile regardless
-                            try:
-                                self.projectiles.remove(projectile)
-                            except Exception:
-                                pass
+                        pygame.draw.rect(self.display, (255, 255, 0), (draw_x, draw_y, icon_size, icon_size))
+                        self.outline.add_rect((draw_x, draw_y, icon_size, icon_size))
+                else:
+                    pygame.draw.rect(self.display, (255, 255, 0), (draw_x, draw_y, icon_size, icon_size))
+                    self.outline.add_rect((draw_x, draw_y, icon_size, icon_size))
 
-                            if dead:
-                                try:
-                                    self.enemies.remove(hit_enemy)
-                                except Exception:
-                                    pass
-                                # spawn hit effects for death
-                                for i in range(20):
-                                    angle = random.random() * math.pi * 2
-                                    speed = random.random() * 5
-                                    self.sparks.append(Spark(hit_enemy.rect().center, angle, 2 + random.random()))
-                                    self.particles.append(Particle(self, 'particle', hit_enemy.rect().center, velocity=[math.cos(angle + math.pi) * speed * 0.5, math.sin(angle + math.pi) * speed * 0.5], frame=random.randint(0,7)))
-                                try:
-                                    self.sfx['hit'].play()
-                                except Exception:
-                                    pass
-                            continue
-                    if self.tilemap.solid_check(projectile[0]):
-                        try:
-                            self.projectiles.remove(projectile)
-                        except Exception:
-                            pass
-                        for i in range(4):
-                            self.sparks.append(Spark(projectile[0], random.random() - 0.5 + (math.pi if projectile[1] > 0 else 0), 2 + random.random()))
-                    elif projectile[2] > 360:
-                        try:
-                            self.projectiles.remove(projectile)
-                        except Exception:
-                            pass
-                    elif abs(self.player.dashing) < 50:
-                        if self.player.rect().collidepoint(projectile[0]):
-                            # delegate hit handling to player (tracks hits and triggers death at max hits)
-                            try:
-                                self.projectiles.remove(projectile)
-                            except Exception:
-                                pass
-                            self.player.take_hit()
+            profiler.mark('render.pickups')
 
+            try:
+                self.projectiles.render(self.display, self.assets['projectile'], offset=render_scroll, outline=self.outline)
+            except Exception:
+                pass
+            profiler.mark('render.projectiles')
+            self.sparks.render(self.display, offset=render_scroll, outline=self.outline)
+            profiler.mark('render.sparks')
 
-                for spark in self.sparks.copy():
-                    kill = spark.update()
-                    spark.render(self.display, offset=render_scroll)
-                    if kill:
-                        try:
-                            self.sparks.remove(spark)
-                        except Exception:
-                            pass
+            self.outline.render(self.display_2)
+            profiler.mark('render.outline')
 
-                display_mask = pygame.mask.from_surface(self.display)
-                display_silhouette = display_mask.to_surface(setcolor=(0, 0, 0, 180), unsetcolor=(0, 0, 0, 0))
-                for offset in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                    self.display_2.blit(display_silhouette, offset)
-
-                for particle in self.particles.copy():
-                    kill = particle.update()
-                    particle.render(self.display, offset=render_scroll)
-                    if particle.type == 'left':
-                        particle.pos[0] += math.sin(particle.animation.frame * 0.035) * 0.3
-                    if kill:
-                        try:
-                            self.particles.remove(particle)
-                        except Exception:
-                            pass
+            self.particles.render(self.display, offset=render_scroll)
+            profiler.mark('render.particles')
 
-            else:
-                # paused: keep render_scroll stable so the current frame shows; create a no-op render_scroll
-                render_scroll = (int(self.scroll[0]), int(self.scroll[1]))
+        # transition effect (still draw even when paused)
+        if self.transition:
+            transition_surf = self.transition_surf
+            transition_surf.fill((0, 0, 0))
+            pygame.draw.circle(transition_surf, (255, 255, 255), (self.display.get_width() // 2, self.display.get_height() // 2), (30 - abs(self.transition)) * 8)
+            self.display.blit(transition_surf, (0, 0))
 
-            # transition effect (still draw even when paused)
-            if self.transition:
-                transition_surf = pygame.Surface(self.display.get_size())
-                pygame.draw.circle(transition_surf, (255, 255, 255), (self.display.get_width() // 2, self.display.get_height() // 2), (30 - abs(self.transition)) * 8)
-                transition_surf.set_colorkey((255, 255, 255)) # set it transparent by ignoring the white color
-                self.display.blit(transition_surf, (0, 0))
+        # composite logical display onto the fixed HUD display
+        self.display_2.blit(self.display, (0, 0))
+
+        # draw HUD (fixed to screen) on display_2 so it scales with the final window
+        try:
+            # prepare items: for kunai include cooldown ratio and image if available
+            kunai_cd = 0
+            if hasattr(self.player, 'kunai_cooldown_timer') and hasattr(self.player, 'kunai_cooldown'):
+                kunai_cd = self.player.kunai_cooldown_timer / max(1, self.player.kunai_cooldown)
+            items = {
+                'shuriken': (self.player.shuriken_count, 0, self.assets.get('item/shuriken')),
+                'kunai': (self.player.kunai_count, kunai_cd, self.assets.get('item/kunai'))
+            }
+            # use new render_with_items to draw counts under healthbar (it handles image or fallback glyph)
+            self.hud.render_with_items(self.display_2, self.player.hits, items)
+        except Exception:
+            pass
 
-            # composite logical display onto the fixed HUD display
-            self.display_2.blit(self.display, (0, 0))
+        # Render boss health bar if boss exists
+        try:
+            if hasattr(self, 'boss') and self.boss and self.boss_hud:
+                # Calculate boss hits from HP (boss.max_hp - boss.hp = hits taken)
+                boss_hits = self.boss.max_hp - self.boss.hp
+                self.boss_hud.render(self.display_2, boss_hits)
+        except Exception:
+            pass
 
-            # draw HUD (fixed to screen) on display_2 so it scales with the final window
+        # if boss defeated, show WIN message
+        if self.boss_defeated:
             try:
-                # prepare items: for kunai include cooldown ratio and image if available
-                kunai_cd = 0
-                if hasattr(self.player, 'kunai_cooldown_timer') and hasattr(self.player, 'kunai_cooldown'):
-                    kunai_cd = self.player.kunai_cooldown_timer / max(1, self.player.kunai_cooldown)
-                items = {
-                    'shuriken': (self.player.shuriken_count, 0, self.assets.get('item/shuriken')),
-                    'kunai': (self.player.kunai_count, kunai_cd, self.assets.get('item/kunai'))
-                }
-                # use new render_with_items to draw counts under healthbar (it handles image or fallback glyph)
-                self.hud.render_with_items(self.display_2, self.player.hits, items)
+                self.display_2.blit(overlay_surface(self.display_2.get_size(), (0, 0, 0, 180)), (0, 0))
+                win_font = getattr(self, 'ui_font', None) or get_font(64)
+                win_surf = render_text(win_font, 'WIN!', True, (255, 215, 0))  # Gold color
+                self.display_2.blit(win_surf, (self.display_2.get_width() // 2 - win_surf.get_width() // 2, self.display_2.get_height() // 2 - win_surf.get_height() // 2 - 20))
+                
+                # Victory message
+                victory_font = getattr(self, 'ui_font', None) or get_font(24)
+                victory_surf = render_text(victory_font, 'Boss Defeated!', True, (255, 255, 255))
+                self.display_2.blit(victory_surf, (self.display_2.get_width() // 2 - victory_surf.get_width() // 2, self.display_2.get_height() // 2 + 20))
             except Exception:
                 pass
-
-            # Render boss health bar if boss exists
+        # if paused, overlay a translucent layer with PAUSE
+        elif self.paused:
             try:
-                if hasattr(self, 'boss') and self.boss and self.boss_hud:
-                    # Calculate boss hits from HP (boss.max_hp - boss.hp = hits taken)
-                    boss_hits = self.boss.max_hp - self.boss.hp
-                    self.boss_hud.render(self.display_2, boss_hits)
+                self.display_2.blit(overlay_surface(self.display_2.get_size(), (0, 0, 0, 150)), (0, 0))
+                pause_font = getattr(self, 'ui_font', None) or get_font(36)
+                pause_surf = render_text(pause_font, 'PAUSE', True, (255, 255, 255))
+                self.display_2.blit(pause_surf, (self.display_2.get_width() // 2 - pause_surf.get_width() // 2, self.display_2.get_height() // 2 - pause_surf.get_height() // 2))
             except Exception:
                 pass
 
-            # if boss defeated, show WIN message
-            if self.boss_defeated:
-                try:
-                    overlay = pygame.Surface(self.display_2.get_size(), pygame.SRCALPHA)
-                    overlay.fill((0, 0, 0, 180))
-                    self.display_2.blit(overlay, (0, 0))
-                    win_font = getattr(self, 'ui_font', pygame.font.Font(None, 64))
-                    win_surf = win_font.render('WIN!', True, (255, 215, 0))  # Gold color
-                    self.display_2.blit(win_surf, (self.display_2.get_width() // 2 - win_surf.get_width() // 2, self.display_2.get_height() // 2 - win_surf.get_height() // 2 - 20))
-                    
-                    # Victory message
-                    victory_font = getattr(self, 'ui_font', pygame.font.Font(None, 24))
-                    victory_surf = victory_font.render('Boss Defeated!', True, (255, 255, 255))
-                    self.display_2.blit(victory_surf, (self.display_2.get_width() // 2 - victory_surf.get_width() // 2, self.display_2.get_height() // 2 + 20))
-                except Exception:
-                    pass
-            # if paused, overlay a translucent layer with PAUSE
-            elif self.paused:
-                try:
-                    overlay = pygame.Surface(self.display_2.get_size(), pygame.SRCALPHA)
-                    overlay.fill((0, 0, 0, 150))
-                    self.display_2.blit(overlay, (0, 0))
-                    pause_font = getattr(self, 'ui_font', pygame.font.Font(None, 36))
-                    pause_surf = pause_font.render('PAUSE', True, (255, 255, 255))
-                    self.display_2.blit(pause_surf, (self.display_2.get_width() // 2 - pause_surf.get_width() // 2, self.display_2.get_height() // 2 - pause_surf.get_height() // 2))
-                except Exception:
-                    pass
+            # draw simple buttons: Play again (restart level) and Exit
+            try:
+                # smaller font for buttons
+                btn_font = getattr(self, 'ui_font', None) or get_font(24)
+                btn_w, btn_h = 120, 28
+                spacing = 12
+                center_x = self.display_2.get_width() // 2
+                base_y = self.display_2.get_height() // 2 + 24
+
+                play_rect = pygame.Rect(center_x - btn_w - spacing//2, base_y, btn_w, btn_h)
+                exit_rect = pygame.Rect(center_x + spacing//2, base_y, btn_w, btn_h)
+
+                # button background
+                pygame.draw.rect(self.display_2, (80, 80, 80), play_rect, border_radius=4)
+                pygame.draw.rect(self.display_2, (80, 80, 80), exit_rect, border_radius=4)
+                # button border
+                pygame.draw.rect(self.display_2, (200, 200, 200), play_rect, 2, border_radius=4)
+                pygame.draw.rect(self.display_2, (200, 200, 200), exit_rect, 2, border_radius=4)
+
+                # labels
+                play_label = render_text(btn_font, 'Chọn nhân vật', True, (255, 255, 255))
+                exit_label = render_text(btn_font, 'Exit', True, (255, 255, 255))
+                self.display_2.blit(play_label, (play_rect.x + (btn_w - play_label.get_width()) // 2, play_rect.y + (btn_h - play_label.get_height()) // 2))
+                self.display_2.blit(exit_label, (exit_rect.x + (btn_w - exit_label.get_width()) // 2, exit_rect.y + (btn_h - exit_label.get_height()) // 2))
+            except Exception:
+                pass
 
-                # draw simple buttons: Play again (restart level) and Exit
-                try:
-                    # smaller font for buttons
-                    btn_font = getattr(self, 'ui_font', pygame.font.Font(None, 24))
-                    btn_w, btn_h = 120, 28
-                    spacing = 12
-                    center_x = self.display_2.get_width() // 2
-                    base_y = self.display_2.get_height() // 2 + 24
-
-                    play_rect = pygame.Rect(center_x - btn_w - spacing//2, base_y, btn_w, btn_h)
-                    exit_rect = pygame.Rect(center_x + spacing//2, base_y, btn_w, btn_h)
-
-                    # button background
-                    pygame.draw.rect(self.display_2, (80, 80, 80), play_rect, border_radius=4)
-                    pygame.draw.rect(self.display_2, (80, 80, 80), exit_rect, border_radius=4)
-                    # button border
-                    pygame.draw.rect(self.display_2, (200, 200, 200), play_rect, 2, border_radius=4)
-                    pygame.draw.rect(self.display_2, (200, 200, 200), exit_rect, 2, border_radius=4)
-
-                    # labels
-                    play_label = btn_font.render('Chọn nhân vật', True, (255, 255, 255))
-                    exit_label = btn_font.render('Exit', True, (255, 255, 255))
-                    self.display_2.blit(play_label, (play_rect.x + (btn_w - play_label.get_width()) // 2, play_rect.y + (btn_h - play_label.get_height()) // 2))
-                    self.display_2.blit(exit_label, (exit_rect.x + (btn_w - exit_label.get_width()) // 2, exit_rect.y + (btn_h - exit_label.get_height()) // 2))
-                except Exception:
-                    pass
+        profiler.mark('render.hud')
+        profiler.render(self.display_2)
+        profiler.mark('profiler')
 
-            screenshake_offset = (random.random() * self.screenshake - self.screenshake / 2, random.random() * self.screenshake - self.screenshake / 2)
-            self.window.blit(pygame.transform.scale(self.display_2, self.window.get_size()), screenshake_offset)
-            pygame.display.update()
-            self.clock.tick(60)  # 60 Fps
+        screenshake_offset = (self.fx_random.random() * self.screenshake - self.screenshake / 2, self.fx_random.random() * self.screenshake - self.screenshake / 2)
+        self.presenter.present(self.display_2, screenshake_offset)
+        profiler.mark('present')
 
 if __name__ == "__main__":
+    # python game.py --record session.json saves each session for tools/replay.py (the file holds the last one)
+    record_path = sys.argv[sys.argv.index('--record') + 1] if '--record' in sys.argv[:-1] else None
+
     pygame.init()
     screen = pygame.display.set_mode((800, 600))
     pygame.display.set_caption("Đăng nhập")
@@ -1213,7 +1264,15 @@ if __name__ == "__main__":
             pass
 
         # Run game
-        game.run()
+        game.start_session()
+        if record_path:
+            game.recorder = Recorder(game)
+        try:
+            game.run()
+        finally:
+            if game.recorder is not None:
+                game.recorder.save(record_path)
+                game.recorder = None
         
         # If run() exits due to return_to_character_select, loop back to character select
         # If run() exits due to quit (pygame.quit), the program will have already exited
\ No newline at end of file
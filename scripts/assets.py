@@ -0,0 +1,348 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from scripts.metrics import MetricsCache, surface_metrics
+from scripts.utils import BASE_IMG_PATH, Animation, decode_images, decode_single, finish_image, finish_images, load_images
+
+MANIFEST_PATH = os.path.join('data', 'assets.json')
+MANIFEST_VERSION = 1
+
+# entity folders that are not selectable characters
+RESERVED_ENTITY_DIRS = ('player', 'enemy', 'boss')
+CHARACTER_ACTIONS = ['idle', 'run', 'jump', 'slide', 'wall_slide', 'attack', 'hurt']
+# actions every character gets, copied from its idle animation when the folder is missing
+REQUIRED_ACTIONS = ['wall_slide', 'jump', 'run']
+NON_LOOPING_ACTIONS = ('attack', 'hurt', 'jump')
+
+def image(path):
+    return {'image': path}
+
+def images(path):
+    return {'images': path}
+
+def animation(path, img_dur=5, loop=True, **extra):
+    spec = {'animation': path, 'img_dur': img_dur, 'loop': loop}
+    spec.update(extra)
+    return spec
+
+def has_images(path):
+    full = BASE_IMG_PATH + path
+    return os.path.isdir(full) and bool(os.listdir(full))
+
+def first_existing(paths):
+    for path in paths:
+        if has_images(path):
+            return path
+    return None
+
+def build_manifest():
+    """Scan data/images and describe every asset key Game uses, without loading any pixels.
+
+    Returns a dict with 'assets' (key -> spec, or None for a known key with
+    no art), 'characters' (asset prefix -> folder name) and 'dirs' (the
+    folders whose contents decided the manifest, used to spot a stale one).
+    """
+    assets = {
+        'decor': images('tiles/decor'),
+        'grass': images('tiles/grass'),
+        'large_decor': images('tiles/large_decor'),
+        'stone': images('tiles/stone'),
+        'player': image('entities/player.png'),
+        'background': image('background.png'),
+        'clouds': images('clouds'),
+        'enemy/idle': animation('entities/enemy/idle', img_dur=6),
+        'enemy/run': animation('entities/enemy/run', img_dur=4),
+        'boss/idle': None,
+        'boss/run': None,
+        'boss/attack': None,
+        'player/idle': animation('entities/player/idle', img_dur=6),
+        'player/run': animation('entities/player/run', img_dur=4),
+        'player/jump': animation('entities/player/jump', loop=False),
+        'player/slide': animation('entities/player/slide'),
+        'player/wall_slide': animation('entities/player/wall_slide'),
+        'particle/leaf': animation('particles/leaf', img_dur=20, loop=False),
+        'particle/particle': animation('particles/particle', img_dur=6, loop=False),
+        'gun': image('gun.png'),
+        'projectile': image('projectile.png'),
+        'logo': None,
+        'item/kunai': None,
+        'item/shuriken': None,
+    }
+    dirs = [BASE_IMG_PATH, BASE_IMG_PATH + 'entities', BASE_IMG_PATH + 'entities/boss', BASE_IMG_PATH + 'entities/player/items']
+
+    # optional art the user can drop in
+    optional_files = [
+        ('background', 'backgroundDNDK.jpg'),
+        ('logo', 'logogame.png'),
+        ('item/kunai', 'entities/player/items/kunai.png'),
+        ('item/shuriken', 'entities/player/items/shuriken.png'),
+    ]
+    for key, path in optional_files:
+        if os.path.isfile(BASE_IMG_PATH + path):
+            assets[key] = image(path)
+
+    # boss folders may be lowercase or capitalized
+    boss_anims = [
+        ('boss/idle', ['entities/boss/idle', 'entities/boss/Idle'], 8, True),
+        ('boss/walk', ['entities/boss/walk', 'entities/boss/Walk'], 10, True),
+        ('boss/attack1', ['entities/boss/attack1'], 6, False),
+        ('boss/attack2', ['entities/boss/attack2'], 6, False),
+        ('boss/hurt', ['entities/boss/hurt', 'entities/boss/Hurt'], 3, False),
+    ]
+    for key, paths, img_dur, loop in boss_anims:
+        path = first_existing(paths)
+        if path:
+            assets[key] = animation(path, img_dur=img_dur, loop=loop)
+
+    # every other folder under entities is a selectable character
+    characters = {}
+    try:
+        ent_path = os.path.join('data', 'images', 'entities')
+        for entry in sorted(os.listdir(ent_path)):
+            full = os.path.join(ent_path, entry)
+            if not os.path.isdir(full) or entry.lower() in RESERVED_ENTITY_DIRS:
+                continue
+            prefix = 'player_' + entry.lower()
+            characters[prefix] = entry
+            dirs.append(full)
+            # find subdirs case-insensitively
+            subs = {d.lower(): d for d in os.listdir(full) if os.path.isdir(os.path.join(full, d))}
+            for act in CHARACTER_ACTIONS:
+                if act in subs:
+                    # scaled to the default player's height when loaded
+                    assets[f'{prefix}/{act}'] = animation(f'entities/{entry}/{subs[act]}', img_dur=6 if act == 'idle' else 4,
+                                                          loop=act not in NON_LOOPING_ACTIONS, fit='player/idle')
+            if f'{prefix}/idle' in assets:
+                for act in REQUIRED_ACTIONS:
+                    if f'{prefix}/{act}' not in assets:
+                        assets[f'{prefix}/{act}'] = {'copy': f'{prefix}/idle', 'img_dur': 4, 'loop': act not in NON_LOOPING_ACTIONS}
+    except Exception:
+        # discovery is best-effort
+        pass
+
+    return {'version': MANIFEST_VERSION, 'assets': assets, 'characters': characters, 'dirs': dirs}
+
+def write_manifest(manifest, path=MANIFEST_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+
+def manifest_stale(manifest, path):
+    """True if a folder the manifest was built from changed after it was written."""
+    written = os.path.getmtime(path)
+    for d in manifest.get('dirs', []):
+        try:
+            if os.path.getmtime(d) > written:
+                return True
+        except OSError:
+            return True
+    return False
+
+def load_manifest(path=MANIFEST_PATH):
+    """Read the generated manifest (tools/build_manifest.py), rescanning if it is missing or stale."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION and not manifest_stale(manifest, path):
+            return manifest
+    except Exception:
+        pass
+    return build_manifest()
+
+class AssetRegistry:
+    """Game.assets: a dict-like view over the manifest that loads each key on first use.
+
+    Lookups, `in`, get(), keys() and item assignment behave like the plain
+    dict Game used to build up front, but pixels are only read when a key is
+    actually used. prefetch() decodes keys on a background thread so the
+    files are read by the time they are needed; the first lookup of a key
+    (on the main thread) converts the decoded frames to the display format,
+    waiting for a decode that is still running. Surfaces are never
+    converted off the main thread.
+    """
+    def __init__(self, manifest, scales=None):
+        self.specs = manifest['assets']
+        self.characters = manifest.get('characters', {})
+        # per-character height multipliers (see Game.character_scales)
+        self.scales = scales if scales is not None else {}
+        self.loaded = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.executor = None
+        # first-frame height of each fit reference key (see fit_height)
+        self.reference_heights = {}
+        # sprite metrics (bounding box, baseline) per key, backed by an on-disk cache
+        self.metrics = MetricsCache()
+        self.frame_metrics_by_key = {}
+
+    def __contains__(self, key):
+        return key in self.loaded or key in self.specs
+
+    def __getitem__(self, key):
+        if key in self.loaded:
+            return self.loaded[key]
+        if key not in self.specs:
+            raise KeyError(key)
+        return self.resolve(key)
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.loaded[key] = value
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return self[key]
+
+    def keys(self):
+        keys = list(self.specs)
+        keys.extend(k for k in self.loaded if k not in self.specs)
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        # lazily, so a caller that stops early only loads what it looked at
+        for key in self.keys():
+            yield key, self[key]
+
+    def keys_with_prefix(self, prefix):
+        return [key for key in self.keys() if key.startswith(prefix)]
+
+    def resolve(self, key):
+        """Load key once, on the calling (main) thread, from its prefetched decode when there is one."""
+        with self.lock:
+            if key in self.loaded:
+                return self.loaded[key]
+            future = self.pending.get(key)
+        decoded = None
+        if future is not None:
+            try:
+                decoded = future.result()
+            except Exception:
+                # cancelled or failed in the background: load it here from scratch
+                decoded = None
+        try:
+            value = self.load(key, self.specs.get(key), decoded)
+        except Exception as e:
+            print(f"Failed to load asset {key}: {e}")
+            value = None
+        with self.lock:
+            # an explicit assignment made while loading wins
+            value = self.loaded.setdefault(key, value)
+            self.pending.pop(key, None)
+        return value
+
+    def decode(self, key):
+        """Background half of load: read and scale the files of key without converting them (None = nothing to decode)."""
+        spec = self.specs.get(key)
+        if spec is None:
+            return None
+        if 'image' in spec:
+            return decode_single(spec['image'])
+        if 'images' in spec:
+            return decode_images(spec['images'])
+        if 'animation' in spec:
+            return decode_images(spec['animation'], self.spec_height(key, spec))
+        return None
+
+    def load(self, key, spec, decoded=None):
+        if spec is None:
+            return None
+        if 'image' in spec:
+            return finish_image(spec['image'], decoded)
+        if 'images' in spec:
+            return finish_images(spec['images'], decoded) if decoded is not None else load_images(spec['images'])
+        if 'copy' in spec:
+            return Animation(self[spec['copy']].images, img_dur=spec['img_dur'], loop=spec['loop'])
+        height = self.spec_height(key, spec)
+        images = finish_images(spec['animation'], decoded, height) if decoded is not None else load_images(spec['animation'], height)
+        return Animation(images, img_dur=spec['img_dur'], loop=spec['loop'])
+
+    def spec_height(self, key, spec):
+        if not spec.get('fit'):
+            return None
+        return self.fit_height(spec['fit'], self.scales.get(key.split('/')[0], 1.0))
+
+    def fit_height(self, reference_key, mult):
+        """Frame height that matches reference_key's first frame (times mult), or None to keep sizes.
+
+        Read from the reference's first file, so it is the same on any thread
+        and does not load (or convert) the reference itself.
+        """
+        try:
+            height = self.reference_heights.get(reference_key)
+            if height is None:
+                sources = self.sources(self.specs.get(reference_key))
+                if not sources:
+                    return None
+                height = self.reference_heights[reference_key] = pygame.image.load(sources[0]).get_height()
+            return max(1, int(height * mult))
+        except Exception:
+            return None
+
+    def sources(self, spec):
+        """Source file of each frame a spec loads, in frame order (None if unknown)."""
+        if spec is None:
+            return None
+        if 'image' in spec:
+            return [BASE_IMG_PATH + spec['image']]
+        if 'copy' in spec:
+            return self.sources(self.specs.get(spec['copy']))
+        path = spec.get('images') or spec.get('animation')
+        try:
+            return [BASE_IMG_PATH + path + '/' + name for name in sorted(os.listdir(BASE_IMG_PATH + path))]
+        except OSError:
+            return None
+
+    def frame_metrics(self, key):
+        """Per-frame metrics (see scripts/metrics.py) for an image, image list or animation key.
+
+        Entity alignment code can use the bounding boxes and baselines here
+        instead of scanning pixels; results persist across runs.
+        """
+        if key in self.frame_metrics_by_key:
+            return self.frame_metrics_by_key[key]
+        value = self.get(key)
+        if value is None:
+            frames = []
+        elif hasattr(value, 'images'):
+            frames = value.images
+        elif isinstance(value, list):
+            frames = value
+        else:
+            frames = [value]
+        sources = self.sources(self.specs.get(key))
+        if sources is None or len(sources) != len(frames):
+            sources = [None] * len(frames)
+        metrics = [self.metrics.get(source, img) if source else surface_metrics(img) for source, img in zip(sources, frames)]
+        self.metrics.save()
+        self.frame_metrics_by_key[key] = metrics
+        return metrics
+
+    def prefetch(self, keys):
+        """Start decoding keys in the background (already loaded or unknown keys are skipped).
+
+        Only files are read and scaled there; the conversion is left for
+        the first lookup on the main thread.
+        """
+        with self.lock:
+            keys = [key for key in keys if key in self.specs and key not in self.loaded and key not in self.pending]
+            if not keys:
+                return
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='assets')
+            for key in keys:
+                self.pending[key] = self.executor.submit(self.decode, key)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
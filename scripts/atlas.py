@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+
+import pygame
+
+ATLAS_DIR = os.path.join('data', 'atlas')
+ATLAS_INDEX = os.path.join(ATLAS_DIR, 'atlas.json')
+ATLAS_VERSION = 1
+PAGE_SIZE = 512
+# frames bigger than this stay as their own files (backgrounds, logo)
+MAX_FRAME_SIZE = 256
+PADDING = 1
+
+def frame_group(path):
+    """Atlas page group for an image path: one per entity folder, tile set family or top-level folder."""
+    parts = path.split('/')
+    if len(parts) == 1:
+        return 'misc'
+    if parts[0] == 'entities' and len(parts) > 2:
+        return 'entities_' + parts[1].lower()
+    return parts[0]
+
+def shelf_pack(sizes, width=PAGE_SIZE, height=PAGE_SIZE, padding=PADDING):
+    """Place (w, h) rects on width x height pages, tallest first in rows (shelves).
+
+    Returns a list of (page, x, y) in the same order as sizes.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    placed = [None] * len(sizes)
+    page, x, y, shelf_h = 0, 0, 0, 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width:
+            x, y, shelf_h = 0, y + shelf_h + padding, 0
+        if y + h > height:
+            page, x, y, shelf_h = page + 1, 0, 0, 0
+        placed[i] = (page, x, y)
+        x += w + padding
+        shelf_h = max(shelf_h, h)
+    return placed
+
+def build_atlas(base_path, out_dir=ATLAS_DIR, page_size=PAGE_SIZE):
+    """Pack every small image under base_path into atlas pages plus an index.
+
+    Frames are stored exactly as load_image would produce them (after
+    convert(), before the colorkey), so a display mode must already be set.
+    Returns the index dict that was written.
+    """
+    groups = {}
+    for root, dirs, files in os.walk(base_path):
+        dirs.sort()
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            path = os.path.relpath(full, base_path).replace(os.sep, '/')
+            try:
+                img = pygame.image.load(full).convert()
+            except Exception:
+                continue
+            if img.get_width() > MAX_FRAME_SIZE or img.get_height() > MAX_FRAME_SIZE:
+                continue
+            groups.setdefault(frame_group(path), []).append((path, img, os.stat(full).st_mtime_ns))
+
+    os.makedirs(out_dir, exist_ok=True)
+    index = {'version': ATLAS_VERSION, 'pages': [], 'frames': {}}
+    for group in sorted(groups):
+        entries = groups[group]
+        sizes = [img.get_size() for _, img, _ in entries]
+        # roughly square shelves, then each page is trimmed to what was placed on it
+        area = sum((w + PADDING) * (h + PADDING) for w, h in sizes)
+        width = min(page_size, max(max(w for w, _ in sizes), int(area ** 0.5 * 1.2)))
+        placed = shelf_pack(sizes, width, page_size)
+        page_count = max(p[0] for p in placed) + 1
+        extents = [[1, 1] for _ in range(page_count)]
+        for (w, h), (page, x, y) in zip(sizes, placed):
+            extents[page][0] = max(extents[page][0], x + w)
+            extents[page][1] = max(extents[page][1], y + h)
+        pages = [pygame.Surface(extent) for extent in extents]
+        first = len(index['pages'])
+        for (path, img, mtime), (page, x, y) in zip(entries, placed):
+            pages[page].blit(img, (x, y))
+            index['frames'][path] = [first + page, x, y, img.get_width(), img.get_height(), mtime]
+        for i, surf in enumerate(pages):
+            name = f'{group}_{i}.png'
+            pygame.image.save(surf, os.path.join(out_dir, name))
+            index['pages'].append(name)
+    with open(os.path.join(out_dir, 'atlas.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    return index
+
+class Atlas:
+    """Runtime side of the atlas: serves frames as subsurfaces of lazily loaded pages.
+
+    A frame is only served while its source file still has the mtime it was
+    packed with, so edited art is picked up from disk until the atlas is
+    rebuilt.
+    """
+    def __init__(self, index, directory=ATLAS_DIR):
+        self.directory = directory
+        self.page_names = index['pages']
+        self.frames = index['frames']
+        self.pages = {}
+        self.lock = threading.Lock()
+
+    def page(self, i):
+        with self.lock:
+            if i not in self.pages:
+                self.pages[i] = pygame.image.load(os.path.join(self.directory, self.page_names[i])).convert()
+            return self.pages[i]
+
+    def has(self, path, full_path):
+        """True if the frame for path is packed and not stale (no pixels are touched)."""
+        frame = self.frames.get(path)
+        if frame is None:
+            return False
+        try:
+            return os.stat(full_path).st_mtime_ns == frame[5]
+        except OSError:
+            return False
+
+    def image(self, path, full_path):
+        """Return the frame for path (relative to data/images) or None if it is not packed or is stale."""
+        if not self.has(path, full_path):
+            return None
+        page, x, y, w, h, mtime = self.frames[path]
+        return self.page(page).subsurface((x, y, w, h))
+
+def load_atlas(path=ATLAS_INDEX):
+    """Read the atlas index written by tools/build_atlas.py, or None if there is no (usable) atlas."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != ATLAS_VERSION:
+            return None
+        return Atlas(index, os.path.dirname(path))
+    except Exception:
+        return None
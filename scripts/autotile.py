@@ -0,0 +1,89 @@
+from array import array
+
+import numpy as np
+
+# bit per neighbor direction in an autotile mask
+NEIGHBOR_BITS = {(1, 0): 1, (-1, 0): 2, (0, -1): 4, (0, 1): 8}
+
+def build_lut(autotile_map):
+    """Turn AUTOTILE_MAP (sorted neighbor tuples -> variant) into a 16-entry mask table (-1 = keep)."""
+    lut = np.full(16, -1, dtype=np.int16)
+    for neighbors, variant in autotile_map.items():
+        mask = 0
+        for shift in neighbors:
+            mask |= NEIGHBOR_BITS[shift]
+        lut[mask] = variant
+    return lut
+
+def chunk_cells(grid, key):
+    return np.frombuffer(grid.chunks[key], dtype=np.uint16).reshape(grid.chunk_size, grid.chunk_size)
+
+def pack_ids(grid, x1, y1, x2, y2):
+    """Return the packed tile ids over tiles x1..x2, y1..y2 (inclusive) as a (rows=y, cols=x) array."""
+    size = grid.chunk_size
+    out = np.zeros((y2 - y1 + 1, x2 - x1 + 1), dtype=np.uint16)
+    for cx in range(x1 // size, x2 // size + 1):
+        for cy in range(y1 // size, y2 // size + 1):
+            if (cx, cy) not in grid.chunks:
+                continue
+            ox1, ox2 = max(x1, cx * size), min(x2, cx * size + size - 1)
+            oy1, oy2 = max(y1, cy * size), min(y2, cy * size + size - 1)
+            cells = chunk_cells(grid, (cx, cy))
+            out[oy1 - y1:oy2 - y1 + 1, ox1 - x1:ox2 - x1 + 1] = cells[oy1 - cy * size:oy2 - cy * size + 1, ox1 - cx * size:ox2 - cx * size + 1]
+    return out
+
+def grid_region(grid):
+    """Tile bounds (x1, y1, x2, y2) covering every allocated chunk, or None."""
+    if not grid.chunks:
+        return None
+    size = grid.chunk_size
+    cxs = [key[0] for key in grid.chunks]
+    cys = [key[1] for key in grid.chunks]
+    return min(cxs) * size, min(cys) * size, max(cxs) * size + size - 1, max(cys) * size + size - 1
+
+def autotile_grid(grid, autotile_types, lut, region=None):
+    """Re-pick variants for autotiled tiles in region (default: the whole grid).
+
+    Neighbor masks for the region are computed in one vectorized pass and
+    looked up in lut; only chunks whose cells actually changed are written
+    back. Returns the number of tiles whose variant changed.
+    """
+    if region is None:
+        region = grid_region(grid)
+        if region is None:
+            return 0
+    x1, y1, x2, y2 = region
+    # one tile of padding so edge cells can see their neighbors
+    ids = pack_ids(grid, x1 - 1, y1 - 1, x2 + 1, y2 + 1)
+    types = ids >> 8
+    center = types[1:-1, 1:-1]
+    mask = ((types[1:-1, 2:] == center) * 1
+            | (types[1:-1, :-2] == center) * 2
+            | (types[:-2, 1:-1] == center) * 4
+            | (types[2:, 1:-1] == center) * 8)
+    variants = lut[mask]
+    codes = [grid.type_ids[name] + 1 for name in autotile_types if name in grid.type_ids]
+    apply = np.isin(center, codes) & (variants >= 0)
+
+    old = ids[1:-1, 1:-1]
+    new = old.copy()
+    new[apply] = (center[apply] << 8) | variants[apply].astype(np.uint16)
+    changed = new != old
+    total = int(changed.sum())
+    if not total:
+        return 0
+
+    size = grid.chunk_size
+    for cx in range(x1 // size, x2 // size + 1):
+        for cy in range(y1 // size, y2 // size + 1):
+            if (cx, cy) not in grid.chunks:
+                continue
+            ox1, ox2 = max(x1, cx * size), min(x2, cx * size + size - 1)
+            oy1, oy2 = max(y1, cy * size), min(y2, cy * size + size - 1)
+            part = (slice(oy1 - y1, oy2 - y1 + 1), slice(ox1 - x1, ox2 - x1 + 1))
+            if not changed[part].any():
+                continue
+            cells = chunk_cells(grid, (cx, cy)).copy()
+            cells[oy1 - cy * size:oy2 - cy * size + 1, ox1 - cx * size:ox2 - cx * size + 1] = new[part]
+            grid.put_chunk((cx, cy), array('H', cells.tobytes()))
+    return total
@@ -0,0 +1,111 @@
+from array import array
+
+CHUNK_SIZE = 16
+EMPTY = 0
+# a variant has to fit the low byte of a packed tile id
+MAX_VARIANT = 0xFF
+
+class TileChunks:
+    """Sparse on-grid tile storage split into fixed-size chunks.
+
+    Each chunk is an array('H') of chunk_size * chunk_size cells keyed by its
+    integer (cx, cy) coordinate. A cell is EMPTY (0) or a packed tile id:
+    (type index + 1) in the high byte and the variant in the low byte.
+    """
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.chunks = {}
+        # type index -> type name, and the reverse lookup
+        self.types = []
+        self.type_ids = {}
+        self.count = 0
+        # chunk key -> revision of its last edit, so caches can spot stale chunks
+        self.versions = {}
+        self.revision = 0
+
+    def type_id(self, tile_type):
+        if tile_type not in self.type_ids:
+            self.type_ids[tile_type] = len(self.types)
+            self.types.append(tile_type)
+        return self.type_ids[tile_type]
+
+    def pack(self, tile_type, variant):
+        if not 0 <= variant <= MAX_VARIANT:
+            raise ValueError(f"tile variant {variant} of '{tile_type}' is outside 0-{MAX_VARIANT}")
+        return ((self.type_id(tile_type) + 1) << 8) | variant
+
+    def unpack(self, tile_id):
+        return self.types[(tile_id >> 8) - 1], tile_id & 0xFF
+
+    def tile_type(self, tile_id):
+        return self.types[(tile_id >> 8) - 1]
+
+    def get(self, x, y):
+        size = self.chunk_size
+        chunk = self.chunks.get((x // size, y // size))
+        if chunk is None:
+            return EMPTY
+        return chunk[(y % size) * size + x % size]
+
+    def set(self, x, y, tile_id):
+        size = self.chunk_size
+        key = (x // size, y // size)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if tile_id == EMPTY:
+                return
+            chunk = array('H', bytes(2 * size * size))
+            self.chunks[key] = chunk
+        i = (y % size) * size + x % size
+        if chunk[i] == tile_id:
+            return
+        if chunk[i] == EMPTY:
+            self.count += 1
+        elif tile_id == EMPTY:
+            self.count -= 1
+        chunk[i] = tile_id
+        self.revision += 1
+        self.versions[key] = self.revision
+
+    def put_chunk(self, key, chunk):
+        """Install a whole chunk array, e.g. one read straight from a binary map."""
+        old = self.chunks.get(key)
+        if old is not None:
+            self.count -= len(old) - old.count(EMPTY)
+        self.chunks[key] = chunk
+        self.count += len(chunk) - chunk.count(EMPTY)
+        self.revision += 1
+        self.versions[key] = self.revision
+
+    def remove(self, x, y):
+        self.set(x, y, EMPTY)
+
+    def clear(self):
+        self.chunks = {}
+        self.versions = {}
+        self.count = 0
+        self.revision += 1
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """Yield (x, y, tile_id) for every non-empty cell."""
+        size = self.chunk_size
+        for (cx, cy), chunk in list(self.chunks.items()):
+            base_x = cx * size
+            base_y = cy * size
+            for i, tile_id in enumerate(chunk):
+                if tile_id:
+                    yield base_x + i % size, base_y + i // size, tile_id
+
+    def bounds(self):
+        """Return (min_x, min_y, max_x, max_y) in tiles, or None when empty."""
+        xs = []
+        ys = []
+        for x, y, tile_id in self:
+            xs.append(x)
+            ys.append(y)
+        if not xs:
+            return None
+        return min(xs), min(ys), max(xs), max(ys)
@@ -1,32 +1,116 @@
 import random
 
-class Cloud:
-    def __init__(self, pos, img, speed, depth):
-        self.pos = list(pos)
-        self.img = img
-        self.speed = speed
+import pygame
+
+# screen size the layers wrap around (the logical display)
+VIEW_SIZE = (320, 240)
+# depth range of the cloud bands: 0 stays put, 1 moves with the camera
+NEAR_DEPTH = 0.8
+FAR_DEPTH = 0.2
+
+class CloudLayer:
+    """One depth band of clouds, pre-composited into a wrap-around strip.
+
+    The strip is a torus one view plus one cloud larger than the view in
+    each direction, so clouds leave the screen completely before they wrap,
+    like the old per-cloud modulo did. Rendering tiles it at most 2x2 times
+    (clipped to the view) no matter how many clouds were baked in.
+    """
+    def __init__(self, cloud_images, count, depth, speed, view_size=VIEW_SIZE):
         self.depth = depth
-    
+        self.speed = speed
+        self.drift = random.random() * 99999
+        margin_w = max(img.get_width() for img in cloud_images)
+        margin_h = max(img.get_height() for img in cloud_images)
+        self.period = (view_size[0] + margin_w, view_size[1] + margin_h)
+        pw, ph = self.period
+        self.strip = pygame.Surface(self.period)
+        self.strip.fill((0, 0, 0))
+        for _ in range(count):
+            img = random.choice(cloud_images)
+            x, y = random.random() * pw, random.random() * ph
+            # also blit the copies one period back so clouds crossing the seam wrap
+            for dx in (0, -pw):
+                for dy in (0, -ph):
+                    self.strip.blit(img, (x + dx, y + dy))
+        self.strip.set_colorkey((0, 0, 0))
+        self.bands = self.split_bands()
+
+    def split_bands(self):
+        """Cut the strip into (x, y, surface) bands of consecutive rows that have cloud pixels.
+
+        Only the bands are blitted, so the empty sky between them costs
+        nothing; with dense layers the bands merge into the whole strip.
+        """
+        pw, ph = self.period
+        rows = [False] * ph
+        for rect in pygame.mask.from_surface(self.strip).get_bounding_rects():
+            for y in range(rect.top, rect.bottom):
+                rows[y] = True
+        bands = []
+        y = 0
+        while y < ph:
+            if not rows[y]:
+                y += 1
+                continue
+            start = y
+            while y < ph and rows[y]:
+                y += 1
+            row = self.strip.subsurface((0, start, pw, y - start))
+            area = row.get_bounding_rect()
+            band = row.subsurface(area).copy()
+            # black is transparent, as in the cloud images
+            band.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            bands.append((area.x, start, band))
+        return bands
+
     def update(self):
-        self.pos[0] += self.speed
-        
-    def render(self, surf, offset=(0, 0)):
-        render_pos = (self.pos[0] - offset[0] * self.depth, self.pos[1] - offset[1] * self.depth)
-        surf.blit(self.img, (render_pos[0] % (surf.get_width() + self.img.get_width()) - self.img.get_width(), render_pos[1] % (surf.get_height() + self.img.get_height()) - self.img.get_height()))
-        
+        self.drift += self.speed
+
+    def render(self, surf, offset=(0, 0), outline=None):
+        pw, ph = self.period
+        # whole pixels, so every band lands where it sits in the strip
+        x = int((self.drift - offset[0] * self.depth) % pw)
+        y = int((-offset[1] * self.depth) % ph)
+        w, h = surf.get_size()
+        for tx in (x - pw, x):
+            if tx >= w or tx + pw <= 0:
+                continue
+            for ty in (y - ph, y):
+                if ty >= h or ty + ph <= 0:
+                    continue
+                for band_x, band_y, band in self.bands:
+                    bx, by = tx + band_x, ty + band_y
+                    if bx >= w or by >= h or bx + band.get_width() <= 0 or by + band.get_height() <= 0:
+                        continue
+                    surf.blit(band, (bx, by))
+                    if outline:
+                        outline.add(band, (bx, by))
+
 class Clouds:
-    def __init__(self, cloud_images, count=16):
-        self.clouds = []
-        
-        for i in range(count):
-            self.clouds.append(Cloud((random.random() * 99999, random.random() * 99999), random.choice(cloud_images), random.random() * 0.05 + 0.05, random.random() * 0.6 + 0.2))
-        
-        self.clouds.sort(key=lambda x: x.depth)
-    
+    """Parallax sky: count clouds spread over `layers` depth bands, far to near.
+
+    Each band is baked once into a CloudLayer, so the per-frame cost
+    depends on the number of layers, not on the number of clouds.
+    """
+    def __init__(self, cloud_images, count=16, layers=3, view_size=VIEW_SIZE):
+        self.layers = []
+        if not cloud_images or not count or layers < 1:
+            return
+        per_layer = [count // layers + (1 if i < count % layers else 0) for i in range(layers)]
+        for i, n in enumerate(per_layer):
+            if not n:
+                continue
+            # band centre, far to near; nearer bands drift a little faster
+            t = (i + 0.5) / layers
+            depth = FAR_DEPTH + (NEAR_DEPTH - FAR_DEPTH) * t
+            speed = 0.05 + 0.05 * t
+            self.layers.append(CloudLayer(cloud_images, n, depth, speed, view_size))
+
     def update(self):
-        for cloud in self.clouds:
-            cloud.update()
-    
-    def render(self, surf, offset=(0, 0)):
-        for cloud in self.clouds:
-            cloud.render(surf, offset=offset)
\ No newline at end of file
+        for layer in self.layers:
+            layer.update()
+
+    def render(self, surf, offset=(0, 0), outline=None):
+        for layer in self.layers:
+            layer.render(surf, offset=offset, outline=outline)
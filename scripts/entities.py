@@ -3,10 +3,10 @@ import random
 
 import pygame
 
-from scripts.particle import Particle
-from scripts.spark import Spark
+from scripts.projectiles import OWNER_BOSS, OWNER_ENEMY, OWNER_PLAYER
+from scripts.utils import AnimationPlayer
 
-class PhysicsEntity:
+class PhysicsEntity(AnimationPlayer):
     def __init__(self, game, e_type, pos, size):
         self.game = game
         self.type = e_type
@@ -31,44 +31,23 @@ class PhysicsEntity:
         if action != self.action:
             self.action = action
             # try to use the configured asset prefix (self.type). If missing, fallback to 'player' or any available animation
-            key = self.type + '/' + self.action
-            try:
-                self.animation = self.game.assets[key].copy()
-                try:
-                    # reset animation state to ensure it's not already marked done
-                    self.animation.done = False
-                    self.animation.frame = 0
-                except Exception:
-                    pass
-            except Exception:
-                # fallback to default player assets if available
+            clip = None
+            for key in (self.type + '/' + self.action, 'player/' + self.action):
                 try:
-                    self.animation = self.game.assets['player/' + self.action].copy()
-                    try:
-                        self.animation.done = False
-                        self.animation.frame = 0
-                    except Exception:
-                        pass
+                    clip = self.game.assets[key]
                 except Exception:
-                    # final fallback: pick any animation-like asset if present
-                    found = None
-                    for k, v in self.game.assets.items():
-                        if isinstance(k, str) and k.endswith('/' + self.action):
-                            found = v
-                            break
-                    if found is not None:
-                        try:
-                            self.animation = found.copy()
-                            try:
-                                self.animation.done = False
-                                self.animation.frame = 0
-                            except Exception:
-                                pass
-                        except Exception:
-                            self.animation = found
-                    else:
-                        # leave animation as-is or set to a dummy empty animation object
-                        self.animation = getattr(self, 'animation', None)
+                    clip = None
+                if clip is not None:
+                    break
+            if clip is None:
+                # final fallback: pick any animation-like asset if present
+                for k, v in self.game.assets.items():
+                    if isinstance(k, str) and k.endswith('/' + self.action):
+                        clip = v
+                        break
+            # with nothing found, leave the current animation as-is
+            if clip is not None:
+                self.play(clip)
         
     def update(self, tilemap, movement=(0, 0)):
         self.collisions = {'up': False, 'down': False, 'right': False, 'left': False}
@@ -110,22 +89,29 @@ class PhysicsEntity:
         
         if self.collisions['down'] or self.collisions['up']:
             self.velocity[1] = 0
-            
-        self.animation.update()
         
-    def render(self, surf, offset=(0, 0)):
+    def render(self, surf, offset=(0, 0), outline=None):
         try:
-            img = self.animation.img()
+            img = self.anim_img()
+            size = None
             if getattr(self, 'visual_scale', 1.0) != 1.0:
                 vs = float(self.visual_scale)
                 new_w = max(1, int(img.get_width() * vs))
                 new_h = max(1, int(img.get_height() * vs))
-                img = pygame.transform.scale(img, (new_w, new_h))
-            surf.blit(pygame.transform.flip(img, self.flip, False), (self.pos[0] - offset[0] + int(self.anim_offset[0] * getattr(self, 'visual_scale', 1.0)), self.pos[1] - offset[1] + int(self.anim_offset[1] * getattr(self, 'visual_scale', 1.0))))
+                size = (new_w, new_h)
+            pos = (self.pos[0] - offset[0] + int(self.anim_offset[0] * getattr(self, 'visual_scale', 1.0)), self.pos[1] - offset[1] + int(self.anim_offset[1] * getattr(self, 'visual_scale', 1.0)))
+            frame = self.game.transforms.get(img, self.flip, size)
+            surf.blit(frame, pos)
+            if outline:
+                outline.add(frame, pos)
         except Exception:
             # fallback: original behavior
             try:
-                surf.blit(pygame.transform.flip(self.animation.img(), self.flip, False), (self.pos[0] - offset[0] + self.anim_offset[0], self.pos[1] - offset[1] + self.anim_offset[1]))
+                pos = (self.pos[0] - offset[0] + self.anim_offset[0], self.pos[1] - offset[1] + self.anim_offset[1])
+                frame = self.game.transforms.get(self.anim_img(), self.flip)
+                surf.blit(frame, pos)
+                if outline:
+                    outline.add(frame, pos)
             except Exception:
                 pass
         
@@ -150,14 +136,14 @@ class Enemy(PhysicsEntity):
                 if (abs(dis[1]) < 16):
                     if (self.flip and dis[0] < 0):
                         self.game.sfx['shoot'].play()
-                        self.game.projectiles.append([[self.rect().centerx - 7, self.rect().centery], -1.5, 0])
+                        start = self.game.projectiles.spawn((self.rect().centerx - 7, self.rect().centery), (-1.5, 0), OWNER_ENEMY)
                         for i in range(4):
-                            self.game.sparks.append(Spark(self.game.projectiles[-1][0], random.random() - 0.5 + math.pi, 2 + random.random()))
+                            self.game.sparks.spawn(start, random.random() - 0.5 + math.pi, 2 + random.random())
                     if (not self.flip and dis[0] > 0):
                         self.game.sfx['shoot'].play()
-                        self.game.projectiles.append([[self.rect().centerx + 7, self.rect().centery], 1.5, 0])
+                        start = self.game.projectiles.spawn((self.rect().centerx + 7, self.rect().centery), (1.5, 0), OWNER_ENEMY)
                         for i in range(4):
-                            self.game.sparks.append(Spark(self.game.projectiles[-1][0], random.random() - 0.5, 2 + random.random()))
+                            self.game.sparks.spawn(start, random.random() - 0.5, 2 + random.random())
         elif random.random() < 0.01:
             self.walking = random.randint(30, 120)
         
@@ -175,19 +161,24 @@ class Enemy(PhysicsEntity):
                 for i in range(30):
                     angle = random.random() * math.pi * 2
                     speed = random.random() * 5
-                    self.game.sparks.append(Spark(self.rect().center, angle, 2 + random.random()))
-                    self.game.particles.append(Particle(self.game, 'particle', self.rect().center, velocity=[math.cos(angle + math.pi) * speed * 0.5, math.sin(angle + math.pi) * speed * 0.5], frame=random.randint(0, 7)))
-                self.game.sparks.append(Spark(self.rect().center, 0, 5 + random.random()))
-                self.game.sparks.append(Spark(self.rect().center, math.pi, 5 + random.random()))
+                    self.game.sparks.spawn(self.rect().center, angle, 2 + random.random())
+                    self.game.particles.spawn('particle', self.rect().center, velocity=[math.cos(angle + math.pi) * speed * 0.5, math.sin(angle + math.pi) * speed * 0.5], frame=random.randint(0, 7))
+                self.game.sparks.spawn(self.rect().center, 0, 5 + random.random())
+                self.game.sparks.spawn(self.rect().center, math.pi, 5 + random.random())
                 return True
             
-    def render(self, surf, offset=(0, 0)):
-        super().render(surf, offset=offset)
+    def render(self, surf, offset=(0, 0), outline=None):
+        super().render(surf, offset=offset, outline=outline)
         
+        gun = self.game.assets['gun']
         if self.flip:
-            surf.blit(pygame.transform.flip(self.game.assets['gun'], True, False), (self.rect().centerx - 4 - self.game.assets['gun'].get_width() - offset[0], self.rect().centery - offset[1]))
+            pos = (self.rect().centerx - 4 - gun.get_width() - offset[0], self.rect().centery - offset[1])
+            gun = self.game.transforms.get(gun, True)
         else:
-            surf.blit(self.game.assets['gun'], (self.rect().centerx + 4 - offset[0], self.rect().centery - offset[1]))
+            pos = (self.rect().centerx + 4 - offset[0], self.rect().centery - offset[1])
+        surf.blit(gun, pos)
+        if outline:
+            outline.add(gun, pos)
 
     def take_hit(self):
         """
@@ -262,9 +253,9 @@ class Player(PhysicsEntity):
                     pass
                 # don't return here, let the normal logic handle wall_slide
             else:
-                # animation.update() already ran in super().update; check if done
+                # the clip's frame follows Game.tick; check if it reached its end
                 try:
-                    done = getattr(self.animation, 'done', False)
+                    done = self.anim_done()
                 except Exception:
                     done = False
                 if done:
@@ -310,7 +301,7 @@ class Player(PhysicsEntity):
                 angle = random.random() * math.pi * 2
                 speed = random.random() * 0.5 + 0.5
                 pvelocity = [math.cos(angle) * speed, math.sin(angle) * speed]
-                self.game.particles.append(Particle(self.game, 'particle', self.rect().center, velocity=pvelocity, frame=random.randint(0, 7)))
+                self.game.particles.spawn('particle', self.rect().center, velocity=pvelocity, frame=random.randint(0, 7))
         if self.dashing > 0:
             self.dashing = max(0, self.dashing - 1)
         if self.dashing < 0:
@@ -320,7 +311,7 @@ class Player(PhysicsEntity):
             if abs(self.dashing) == 51:
                 self.velocity[0] *= 0.1
             pvelocity = [abs(self.dashing) / self.dashing * random.random() * 3, 0]
-            self.game.particles.append(Particle(self.game, 'particle', self.rect().center, velocity=pvelocity, frame=random.randint(0, 7)))
+            self.game.particles.spawn('particle', self.rect().center, velocity=pvelocity, frame=random.randint(0, 7))
                 
         if self.velocity[0] > 0:
             self.velocity[0] = max(self.velocity[0] - 0.1, 0)
@@ -333,9 +324,9 @@ class Player(PhysicsEntity):
         if getattr(self, 'sword_cooldown_timer', 0) > 0:
             self.sword_cooldown_timer = max(0, self.sword_cooldown_timer - 1)
     
-    def render(self, surf, offset=(0, 0)):
+    def render(self, surf, offset=(0, 0), outline=None):
         if abs(self.dashing) <= 50:
-            super().render(surf, offset=offset)
+            super().render(surf, offset=offset, outline=outline)
             
     def jump(self):
         if self.wall_slide:
@@ -382,8 +373,8 @@ class Player(PhysicsEntity):
         for i in range(30):
             angle = random.random() * math.pi * 2
             speed = random.random() * 5
-            self.game.sparks.append(Spark(self.rect().center, angle, 2 + random.random()))
-            self.game.particles.append(Particle(self.game, 'particle', self.rect().center, velocity=[math.cos(angle + math.pi) * speed * 0.5, math.sin(angle + math.pi) * speed * 0.5], frame=random.randint(0,7)))
+            self.game.sparks.spawn(self.rect().center, angle, 2 + random.random())
+            self.game.particles.spawn('particle', self.rect().center, velocity=[math.cos(angle + math.pi) * speed * 0.5, math.sin(angle + math.pi) * speed * 0.5], frame=random.randint(0,7))
 
         # if reached max hits, start death sequence (reuse existing game.dead flow)
         if self.hits >= self.max_hits:
@@ -408,13 +399,12 @@ class Player(PhysicsEntity):
         # spawn a projectile from the player
         dir_x = -1 if self.flip else 1
         start = [self.rect().centerx + ( -6 if self.flip else 6), self.rect().centery]
-        # use same format as Game.projectiles: [[x,y], direction, timer]
-        self.game.projectiles.append([start, dir_x * 3.5, 0])
+        self.game.projectiles.spawn(start, (dir_x * 3.5, 0), OWNER_PLAYER)
         # small effect
         for i in range(6):
             angle = random.random() * math.pi * 2
             speed = random.random() * 1.5
-            self.game.particles.append(Particle(self.game, 'particle', self.rect().center, velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7)))
+            self.game.particles.spawn('particle', self.rect().center, velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7))
         try:
             self.game.sfx['shoot'].play()
         except Exception:
@@ -450,8 +440,8 @@ class Player(PhysicsEntity):
             attack_rect.width += 20
 
         removed = []
-        # Attack regular enemies
-        for enemy in self.game.enemies.copy():
+        # Attack regular enemies (broadphase only returns enemies overlapping the attack)
+        for enemy in self.game.broadphase.query_rect(attack_rect, 'enemy'):
             if attack_rect.colliderect(enemy.rect()):
                 # call take_hit to handle HP properly
                 if enemy.take_hit():
@@ -460,12 +450,12 @@ class Player(PhysicsEntity):
                 for i in range(12):
                     angle = random.random() * math.pi * 2
                     speed = random.random() * 2 + 0.5
-                    self.game.particles.append(Particle(self.game, 'particle', enemy.rect().center, velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7)))
-                self.game.sparks.append(Spark(enemy.rect().center, 0, 5 + random.random()))
-                self.game.sparks.append(Spark(enemy.rect().center, math.pi, 5 + random.random()))
+                    self.game.particles.spawn('particle', enemy.rect().center, velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7))
+                self.game.sparks.spawn(enemy.rect().center, 0, 5 + random.random())
+                self.game.sparks.spawn(enemy.rect().center, math.pi, 5 + random.random())
         
         # Attack boss separately - but only if all enemies are dead
-        if self.game.boss and attack_rect.colliderect(self.game.boss.rect()):
+        if self.game.boss and self.game.broadphase.query_rect(attack_rect, 'boss'):
             if len(self.game.enemies) > 0:
                 # Boss is protected by remaining enemies
                 print("Boss is protected! Defeat all enemies first!")
@@ -473,7 +463,7 @@ class Player(PhysicsEntity):
                 for i in range(8):
                     angle = random.random() * math.pi * 2
                     speed = random.random() * 2
-                    self.game.sparks.append(Spark(self.game.boss.rect().center, angle, 1 + random.random()))
+                    self.game.sparks.spawn(self.game.boss.rect().center, angle, 1 + random.random())
                 # Play a different sound to indicate protection
                 try:
                     self.game.sfx['shoot'].play()  # Use shoot sound as "blocked" sound
@@ -490,12 +480,13 @@ class Player(PhysicsEntity):
                 for i in range(12):
                     angle = random.random() * math.pi * 2
                     speed = random.random() * 2 + 0.5
-                    self.game.particles.append(Particle(self.game, 'particle', self.game.boss.rect().center if self.game.boss else (0, 0), velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7)))
+                    self.game.particles.spawn('particle', self.game.boss.rect().center if self.game.boss else (0, 0), velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7))
                 if self.game.boss:
-                    self.game.sparks.append(Spark(self.game.boss.rect().center, 0, 5 + random.random()))
-                    self.game.sparks.append(Spark(self.game.boss.rect().center, math.pi, 5 + random.random()))
+                    self.game.sparks.spawn(self.game.boss.rect().center, 0, 5 + random.random())
+                    self.game.sparks.spawn(self.game.boss.rect().center, math.pi, 5 + random.random())
         
         for e in removed:
+            self.game.broadphase.remove(e)
             try:
                 self.game.enemies.remove(e)
             except Exception:
@@ -519,25 +510,8 @@ class Player(PhysicsEntity):
                     attack_anim = self.game.assets[k]
                     break
             if attack_anim is not None:
-                try:
-                    # copy the animation and force non-looping so it finishes
-                    new_anim = attack_anim.copy()
-                    try:
-                        new_anim.loop = False
-                        new_anim.done = False
-                        new_anim.frame = 0
-                    except Exception:
-                        pass
-                    self.animation = new_anim
-                except Exception:
-                    # fallback: assign and try to ensure it won't loop
-                    try:
-                        attack_anim.loop = False
-                        attack_anim.done = False
-                        attack_anim.frame = 0
-                    except Exception:
-                        pass
-                    self.animation = attack_anim
+                # play it once (non-looping) so it finishes
+                self.play(attack_anim.once())
                 try:
                     self._attack_override = True
                 except Exception:
@@ -567,8 +541,8 @@ class Player(PhysicsEntity):
             attack_rect.width += 20
 
         removed = []
-        # Attack regular enemies
-        for enemy in self.game.enemies.copy():
+        # Attack regular enemies (broadphase only returns enemies overlapping the attack)
+        for enemy in self.game.broadphase.query_rect(attack_rect, 'enemy'):
             if attack_rect.colliderect(enemy.rect()):
                 # call take_hit to handle HP properly
                 if enemy.take_hit():
@@ -577,12 +551,12 @@ class Player(PhysicsEntity):
                 for i in range(12):
                     angle = random.random() * math.pi * 2
                     speed = random.random() * 2 + 0.5
-                    self.game.particles.append(Particle(self.game, 'particle', enemy.rect().center, velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7)))
-                self.game.sparks.append(Spark(enemy.rect().center, 0, 5 + random.random()))
-                self.game.sparks.append(Spark(enemy.rect().center, math.pi, 5 + random.random()))
+                    self.game.particles.spawn('particle', enemy.rect().center, velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7))
+                self.game.sparks.spawn(enemy.rect().center, 0, 5 + random.random())
+                self.game.sparks.spawn(enemy.rect().center, math.pi, 5 + random.random())
         
         # Attack boss separately - but only if all enemies are dead
-        if self.game.boss and attack_rect.colliderect(self.game.boss.rect()):
+        if self.game.boss and self.game.broadphase.query_rect(attack_rect, 'boss'):
             if len(self.game.enemies) > 0:
                 # Boss is protected by remaining enemies
                 print("Boss is protected! Defeat all enemies first!")
@@ -590,7 +564,7 @@ class Player(PhysicsEntity):
                 for i in range(6):
                     angle = random.random() * math.pi * 2
                     speed = random.random() * 1.5
-                    self.game.sparks.append(Spark(self.game.boss.rect().center, angle, 1 + random.random()))
+                    self.game.sparks.spawn(self.game.boss.rect().center, angle, 1 + random.random())
                 # Play a different sound to indicate protection
                 try:
                     self.game.sfx['shoot'].play()  # Use shoot sound as "blocked" sound
@@ -607,12 +581,13 @@ class Player(PhysicsEntity):
                 for i in range(12):
                     angle = random.random() * math.pi * 2
                     speed = random.random() * 2 + 0.5
-                    self.game.particles.append(Particle(self.game, 'particle', self.game.boss.rect().center if self.game.boss else (0, 0), velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7)))
+                    self.game.particles.spawn('particle', self.game.boss.rect().center if self.game.boss else (0, 0), velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7))
                 if self.game.boss:
-                    self.game.sparks.append(Spark(self.game.boss.rect().center, 0, 5 + random.random()))
-                    self.game.sparks.append(Spark(self.game.boss.rect().center, math.pi, 5 + random.random()))
+                    self.game.sparks.spawn(self.game.boss.rect().center, 0, 5 + random.random())
+                    self.game.sparks.spawn(self.game.boss.rect().center, math.pi, 5 + random.random())
         
         for e in removed:
+            self.game.broadphase.remove(e)
             try:
                 self.game.enemies.remove(e)
             except Exception:
@@ -630,23 +605,8 @@ class Player(PhysicsEntity):
                     attack_anim = self.game.assets[k]
                     break
             if attack_anim is not None:
-                try:
-                    new_anim = attack_anim.copy()
-                    try:
-                        new_anim.loop = False
-                        new_anim.done = False
-                        new_anim.frame = 0
-                    except Exception:
-                        pass
-                    self.animation = new_anim
-                except Exception:
-                    try:
-                        attack_anim.loop = False
-                        attack_anim.done = False
-                        attack_anim.frame = 0
-                    except Exception:
-                        pass
-                    self.animation = attack_anim
+                # play it once (non-looping) so it finishes
+                self.play(attack_anim.once())
                 try:
                     self._attack_override = True
                 except Exception:
@@ -656,7 +616,7 @@ class Player(PhysicsEntity):
         return True
 
 
-class Boss:
+class Boss(AnimationPlayer):
     """A walking boss with stable movement and shooting."""
     def __init__(self, game, pos, size, hp=15):
         print(f"Boss.__init__ called at pos {pos}")
@@ -683,30 +643,22 @@ class Boss:
         self.animation = None
         print("Boss: Trying to load initial animation...")
         
-        # Try boss/idle first - MUST use .copy() to avoid shared frame counters
+        # Try boss/idle first (clips are shared; the playback position is kept on the boss)
         if 'boss/idle' in self.game.assets and self.game.assets['boss/idle'] is not None:
-            try:
-                self.animation = self.game.assets['boss/idle'].copy()
-                print("Boss: Using boss/idle animation (copied)")
-            except Exception as e:
-                print(f"Boss: Failed to copy boss/idle, using direct: {e}")
-                self.animation = self.game.assets['boss/idle']
+            self.play(self.game.assets['boss/idle'])
+            print("Boss: Using boss/idle animation")
         
         # Fallback to enemy/idle
         if self.animation is None and 'enemy/idle' in self.game.assets:
-            try:
-                self.animation = self.game.assets['enemy/idle'].copy()
-                print("Boss: Using enemy/idle animation (copied)")
-            except Exception as e:
-                print(f"Boss: Failed to copy enemy/idle, using direct: {e}")
-                self.animation = self.game.assets['enemy/idle']
+            self.play(self.game.assets['enemy/idle'])
+            print("Boss: Using enemy/idle animation")
                 
         if self.animation is None:
             print("Boss: WARNING - No animation loaded! Creating emergency fallback...")
             # Emergency fallback - create a simple animation from any available asset
             for key in ['boss/idle', 'boss/walk', 'enemy/idle', 'enemy/run']:
                 if key in self.game.assets and self.game.assets[key] is not None:
-                    self.animation = self.game.assets[key]
+                    self.play(self.game.assets[key])
                     print(f"Boss: Emergency fallback using {key}")
                     break
                     
@@ -753,15 +705,10 @@ class Boss:
             self.action = action
             print(f"Boss trying to set action: {action}")
             
-            # Use .copy() to get independent animation instance
             asset_key = f'boss/{action}'
             if asset_key in self.game.assets and self.game.assets[asset_key] is not None:
-                try:
-                    self.animation = self.game.assets[asset_key].copy()
-                    print(f"Boss using animation: {asset_key} (copied)")
-                except:
-                    self.animation = self.game.assets[asset_key]
-                    print(f"Boss using animation: {asset_key} (direct)")
+                self.play(self.game.assets[asset_key])
+                print(f"Boss using animation: {asset_key}")
             else:
                 print(f"No {asset_key} found, checking alternatives...")
                 # If boss animation not available, try alternatives
@@ -770,29 +717,17 @@ class Boss:
                     alternatives = ['boss/run', 'boss/walk', 'boss/idle', 'enemy/idle']
                     for alt in alternatives:
                         if alt in self.game.assets and self.game.assets[alt] is not None:
-                            try:
-                                self.animation = self.game.assets[alt].copy()
-                                print(f"Boss using fallback animation: {alt} (copied)")
-                            except:
-                                self.animation = self.game.assets[alt]
-                                print(f"Boss using fallback animation: {alt} (direct)")
+                            self.play(self.game.assets[alt])
+                            print(f"Boss using fallback animation: {alt}")
                             break
                 else:
                     # For other actions, use boss/idle or enemy/idle
                     if 'boss/idle' in self.game.assets and self.game.assets['boss/idle'] is not None:
-                        try:
-                            self.animation = self.game.assets['boss/idle'].copy()
-                            print("Boss using boss/idle fallback (copied)")
-                        except:
-                            self.animation = self.game.assets['boss/idle']
-                            print("Boss using boss/idle fallback (direct)")
+                        self.play(self.game.assets['boss/idle'])
+                        print("Boss using boss/idle fallback")
                     elif 'enemy/idle' in self.game.assets and self.game.assets['enemy/idle'] is not None:
-                        try:
-                            self.animation = self.game.assets['enemy/idle'].copy()
-                            print("Boss using enemy/idle fallback (copied)")
-                        except:
-                            self.animation = self.game.assets['enemy/idle']
-                            print("Boss using enemy/idle fallback (direct)")
+                        self.play(self.game.assets['enemy/idle'])
+                        print("Boss using enemy/idle fallback")
                         
             # Final check
             if self.animation is None:
@@ -851,21 +786,18 @@ class Boss:
         # Attack timer
         self.attack_timer += 1
         
-        # Update animation if available
+        # The animation frame follows Game.tick
         if self.animation:
             try:
-                self.animation.update()
-
-                    
                 # If attack or hurt animation is done, switch back to walking/idle
-                if (self.action in ['attack1', 'attack2', 'hurt']) and hasattr(self.animation, 'done') and self.animation.done:
+                if (self.action in ['attack1', 'attack2', 'hurt']) and self.anim_done():
                     if self.walking:
                         self.set_action('walk')
                     else:
                         self.set_action('idle')
             except Exception as e:
                 if self.debug_timer % 60 == 0:
-                    print(f"Animation update error: {e}")
+                    print(f"Animation error: {e}")
         
         # Attack every 120 frames (2 seconds at 60fps)
         if self.attack_timer >= 120:
@@ -878,7 +810,7 @@ class Boss:
             # Boss sprite seems backwards - try opposite flip  
             self.flip = dis_x > 0  # Flip when player is on right (boss sprite backwards)
             if self.animation:
-                current_frame = getattr(self.animation, 'frame', 0) // getattr(self.animation, 'img_duration', 1)
+                current_frame = self.anim_frame() // self.animation.img_duration
                 print(f"Boss: distance={distance:.1f}, action={self.action}, frame={current_frame}, flip={self.flip}")
 
             
@@ -926,8 +858,8 @@ class Boss:
             for i in range(15):
                 angle = random.random() * math.pi * 2
                 speed = random.random() * 3 + 1
-                self.game.sparks.append(Spark(self.game.player.rect().center, angle, 3 + random.random()))
-                self.game.particles.append(Particle(self.game, 'particle', self.game.player.rect().center, velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7)))
+                self.game.sparks.spawn(self.game.player.rect().center, angle, 3 + random.random())
+                self.game.particles.spawn('particle', self.game.player.rect().center, velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7))
         
         try:
             self.game.sfx['hit'].play()
@@ -955,12 +887,12 @@ class Boss:
         
         # Create projectile
         start_pos = [self.rect().centerx, self.rect().centery]
-        self.game.projectiles.append([start_pos, dir_x * 1.5, 0])
+        self.game.projectiles.spawn(start_pos, (dir_x * 1.5, 0), OWNER_BOSS)
         
         # Spawn effects
         for i in range(4):
             angle = random.random() - 0.5 + (math.pi if dir_x < 0 else 0)
-            self.game.sparks.append(Spark(start_pos, angle, 2 + random.random()))
+            self.game.sparks.spawn(start_pos, angle, 2 + random.random())
         
         # Handle dash collision - take damage (only when player is actually dashing)
         if abs(self.game.player.dashing) >= 50:
@@ -989,18 +921,13 @@ class Boss:
         # Always try to show hurt animation and reset it
         if 'boss/hurt' in self.game.assets and self.game.assets['boss/hurt'] is not None:
             self.action = 'hurt'  # Force change action
-            self.animation = self.game.assets['boss/hurt']
-            # Reset animation to play from beginning
-            self.animation.frame = 0
-            self.animation.done = False
-            print("Boss using boss/hurt animation (reset)")
+            # play from the beginning (the shared clip itself is not touched)
+            self.play(self.game.assets['boss/hurt'])
+            print("Boss using boss/hurt animation (restarted)")
         elif 'enemy/hurt' in self.game.assets and self.game.assets['enemy/hurt'] is not None:
             self.action = 'hurt'  # Force change action  
-            self.animation = self.game.assets['enemy/hurt']
-            # Reset animation to play from beginning
-            self.animation.frame = 0
-            self.animation.done = False
-            print("Boss using enemy/hurt animation (reset)")
+            self.play(self.game.assets['enemy/hurt'])
+            print("Boss using enemy/hurt animation (restarted)")
         else:
             print("No hurt animation available")
         
@@ -1012,8 +939,8 @@ class Boss:
         for i in range(8):
             angle = random.random() * math.pi * 2
             speed = random.random() * 2
-            self.game.particles.append(Particle(self.game, 'particle', self.rect().center, velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7)))
-        self.game.sparks.append(Spark(self.rect().center, 0, 3 + random.random()))
+            self.game.particles.spawn('particle', self.rect().center, velocity=[math.cos(angle) * speed, math.sin(angle) * speed], frame=random.randint(0, 7))
+        self.game.sparks.spawn(self.rect().center, 0, 3 + random.random())
 
         if self.hp <= 0:
             print("Boss defeated!")  # Debug info
@@ -1021,12 +948,12 @@ class Boss:
             for i in range(40):
                 angle = random.random() * math.pi * 2
                 speed = random.random() * 5
-                self.game.sparks.append(Spark(self.rect().center, angle, 2 + random.random()))
-                self.game.particles.append(Particle(self.game, 'particle', self.rect().center, velocity=[math.cos(angle + math.pi) * speed * 0.5, math.sin(angle + math.pi) * speed * 0.5], frame=random.randint(0, 7)))
+                self.game.sparks.spawn(self.rect().center, angle, 2 + random.random())
+                self.game.particles.spawn('particle', self.rect().center, velocity=[math.cos(angle + math.pi) * speed * 0.5, math.sin(angle + math.pi) * speed * 0.5], frame=random.randint(0, 7))
             return True
         return False
 
-    def render(self, surf, offset=(0, 0)):
+    def render(self, surf, offset=(0, 0), outline=None):
         """Render walking boss."""
         # Debug timer is now handled in update() method
             
@@ -1041,20 +968,22 @@ class Boss:
             draw_pos = (self.pos[0] - offset[0] - self.size[0]//2, self.pos[1] - offset[1] - self.size[1]//2)
             if self.animation:
                 try:
-                    img = self.animation.img()
+                    img = self.anim_img()
                     if img is None:
                         raise Exception("animation.img() returned None")
                     
                     # Scale down the boss sprite if it's too big
+                    new_size = None
                     original_size = img.get_size()
                     if original_size[0] > 32 or original_size[1] > 32:
                         # Scale down large sprites to max 32x32
                         scale_factor = min(32/original_size[0], 32/original_size[1])
                         new_size = (int(original_size[0] * scale_factor), int(original_size[1] * scale_factor))
-                        img = pygame.transform.scale(img, new_size)
                     
-                    final_img = pygame.transform.flip(img, self.flip, False)
+                    final_img = self.game.transforms.get(img, self.flip, new_size)
                     surf.blit(final_img, draw_pos)
+                    if outline:
+                        outline.add(final_img, draw_pos)
                         
                 except Exception as e:
                     if self.debug_timer % 60 == 0:
@@ -1062,10 +991,14 @@ class Boss:
                     # Draw fallback rectangle for animation error
                     rect = pygame.Rect(draw_pos[0], draw_pos[1], self.size[0], self.size[1])
                     pygame.draw.rect(surf, (255, 0, 255), rect)  # Magenta for animation error
+                    if outline:
+                        outline.add_rect(rect)
             else:
                 # No animation available - draw colored rectangle
                 rect = pygame.Rect(draw_pos[0], draw_pos[1], self.size[0], self.size[1])
                 pygame.draw.rect(surf, (150, 50, 150), rect)  # Purple boss
+                if outline:
+                    outline.add_rect(rect)
                 
             # No indicator rectangle needed
             
@@ -1073,6 +1006,8 @@ class Boss:
             # Always have a fallback visual - centered position
             rect = pygame.Rect(self.pos[0] - offset[0] - self.size[0]//2, self.pos[1] - offset[1] - self.size[1]//2, self.size[0], self.size[1])
             pygame.draw.rect(surf, (255, 0, 0), rect)  # Red emergency rectangle
+            if outline:
+                outline.add_rect(rect)
             print(f"Boss render error: {e}")
             
         # Draw health bar above boss - use same position calculation as draw_pos
@@ -1086,6 +1021,8 @@ class Boss:
             bar_y = draw_pos[1] - 20  # Above the indicator
             # Background bar (dark red)
             pygame.draw.rect(surf, (80, 20, 20), (bar_x, bar_y, w + 4, bar_h))
+            if outline:
+                outline.add_rect((bar_x, bar_y, w + 4, bar_h))
             # HP bar (green to red based on HP)
             if hp_ratio > 0.5:
                 color = (30, 200, 30)   # Green
@@ -0,0 +1,49 @@
+import json
+import os
+
+import pygame
+
+def init_headless():
+    """Start pygame without a visible window or an audio device.
+
+    A dummy video driver still provides a display mode, which images need to
+    convert(). Fonts are initialised for the HUD code paths. The mixer is
+    never opened, so use SilentSound in its place.
+    """
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    if pygame.display.get_init() and pygame.display.get_driver() != 'dummy':
+        pygame.display.quit()
+    pygame.display.init()
+    pygame.font.init()
+
+class SilentSound:
+    """Stands in for pygame.mixer.Sound when there is no mixer."""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def play(self, *args, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+def key_event(kind, name):
+    """A KEYDOWN ('down') or KEYUP ('up') event for a key name such as 'RIGHT' or 'x'."""
+    event_type = pygame.KEYDOWN if kind == 'down' else pygame.KEYUP
+    return pygame.event.Event(event_type, key=getattr(pygame, 'K_' + name), unicode='')
+
+def load_input_script(path):
+    """Read scripted input for Game.simulate: {tick: [events]}.
+
+    The file is a JSON list of [tick, 'down' | 'up', key name] entries, e.g.
+    [[0, "down", "RIGHT"], [90, "down", "x"], [240, "up", "RIGHT"]].
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    script = {}
+    for tick, kind, name in entries:
+        script.setdefault(int(tick), []).append(key_event(kind, name))
+    return script
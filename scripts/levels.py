@@ -0,0 +1,142 @@
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from scripts.tilemap import Tilemap
+
+MAP_DIR = os.path.join('data', 'maps')
+
+class PreparedLevel:
+    """A parsed map plus everything load_level pulls out of it.
+
+    Built by prepare_level (usually on the loader thread) from plain map
+    data only: no surface is loaded or converted there. Entities are not
+    created here because they touch game state, and the tilemap's off-grid
+    index is left empty because it is sized from tile images; Game.load_level
+    builds both on the main thread when it swaps the level in.
+    """
+    def __init__(self, index, path):
+        self.index = index
+        self.path = path
+        self.tilemap = None
+        self.leaf_spawners = []
+        self.spawners = []
+        self.pickups = []
+
+def prepare_level(game, index, path, tile_size=16, rng=random):
+    """Parse a map into a PreparedLevel; rng places the random pickups."""
+    level = PreparedLevel(index, path)
+    tilemap = Tilemap(game, tile_size=tile_size)
+    try:
+        # the off-grid index needs tile images, so it is built on the main thread
+        tilemap.load(path, index=False)
+    except Exception as e:
+        print(f"Failed to load map '{path}': {e}")
+        # fallback to an empty map so the game won't crash; user can fix the JSON
+        tilemap.clear()
+    level.tilemap = tilemap
+
+    for tree in tilemap.extract([('large_decor', 2)], keep=True):
+        level.leaf_spawners.append(pygame.Rect(4 + tree['pos'][0], 4 + tree['pos'][1], 23, 13))
+
+    # include variant 2 for boss spawners
+    level.spawners = tilemap.extract([('spawners', 0), ('spawners', 1), ('spawners', 2)])
+    # boss art is only decoded ahead for maps that have a boss (prefetch only queues the file reads)
+    if any(spawner['variant'] == 2 for spawner in level.spawners):
+        game.assets.prefetch(game.assets.keys_with_prefix('boss/'))
+
+    # extract item pickups from map. Variant mapping:
+    # 0 -> shuriken pickup, 1 -> kunai pickup
+    for it in tilemap.extract([('items', 0), ('items', 1)], keep=False):
+        if it['variant'] == 0:
+            level.pickups.append({'type': 'shuriken', 'pos': it['pos']})
+        elif it['variant'] == 1:
+            level.pickups.append({'type': 'kunai', 'pos': it['pos']})
+
+    # spawn a few random pickups on the map (where not solid)
+    try:
+        xs = []
+        ys = []
+        for x, y, tile_id in tilemap.grid:
+            xs.append(int(x * tilemap.tile_size))
+            ys.append(int(y * tilemap.tile_size))
+        for off in tilemap.offgrid_tiles:
+            if 'pos' in off:
+                xs.append(int(off['pos'][0]))
+                ys.append(int(off['pos'][1]))
+        if xs and ys:
+            minx, maxx = min(xs), max(xs)
+            miny, maxy = min(ys), max(ys)
+        else:
+            minx, maxx = 0, game.display.get_width()
+            miny, maxy = 0, game.display.get_height()
+
+        # spawn 2-5 pickups randomly
+        for _ in range(rng.randint(2, 5)):
+            attempts = 0
+            while attempts < 50:
+                rx = rng.randint(minx, maxx)
+                ry = rng.randint(miny, maxy)
+                # avoid solid tiles
+                if not tilemap.solid_check((rx, ry)):
+                    level.pickups.append({'type': rng.choice(['shuriken', 'kunai']), 'pos': [rx, ry]})
+                    break
+                attempts += 1
+    except Exception:
+        pass
+
+    return level
+
+class LevelLoader:
+    """Prepares levels on a single worker thread so swapping maps doesn't stall a frame.
+
+    request() starts preparing a map index in the background; take() returns
+    the prepared level, waiting for it if needed (or preparing it right away
+    when it was never requested). Each prepared level is handed out once,
+    since load_level consumes its spawners.
+
+    Each preparation gets its own RNG, seeded from the global one when it is
+    requested on the main thread, so a seeded session places the same
+    pickups no matter when the worker gets to the map.
+    """
+    def __init__(self, game, map_files, map_dir=MAP_DIR):
+        self.game = game
+        self.map_files = map_files
+        self.map_dir = map_dir
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-loader')
+        self.pending = {}
+
+    def path(self, index):
+        return os.path.join(self.map_dir, self.map_files[index])
+
+    def request(self, index):
+        if not (0 <= index < len(self.map_files)) or index in self.pending:
+            return
+        rng = random.Random(random.getrandbits(64))
+        self.pending[index] = self.executor.submit(prepare_level, self.game, index, self.path(index), rng=rng)
+
+    def ready(self, index):
+        future = self.pending.get(index)
+        return future is not None and future.done()
+
+    def take(self, index, timeout=None):
+        future = self.pending.pop(index, None)
+        if future is None:
+            return prepare_level(self.game, index, self.path(index), rng=random.Random(random.getrandbits(64)))
+        return future.result(timeout)
+
+    def discard(self, index):
+        future = self.pending.pop(index, None)
+        if future is not None:
+            future.cancel()
+
+    def reset(self):
+        """Drop every prepared or queued level (e.g. after reseeding the RNG)."""
+        for index in list(self.pending):
+            self.discard(index)
+
+    def shutdown(self):
+        self.reset()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,100 @@
+"""Compact binary map format (.bmap).
+
+Layout, all little-endian:
+    header      magic b'BMAP', version u16, tile_size u16, chunk_size u16,
+                type count u16, chunk count u32, offgrid count u32
+    type table  per type: name length u8 + utf-8 name
+    chunk keys  per chunk: cx i32, cy i32
+    chunk cells per chunk: chunk_size * chunk_size u16 packed tile ids
+                (same packing as TileChunks, type index into the type table)
+    offgrid     per tile: type index u16, variant u16, x f32, y f32
+
+Chunks are read straight out of an mmap into array('H') buffers, so loading
+never builds a dict per on-grid tile.
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+from scripts.chunks import TileChunks
+
+MAGIC = b'BMAP'
+FORMAT_VERSION = 1
+MAP_EXT = '.bmap'
+
+HEADER = struct.Struct('<4sHHHHII')
+CHUNK_KEY = struct.Struct('<ii')
+OFFGRID = struct.Struct('<HHff')
+
+def write_map(path, tile_size, grid, offgrid_tiles):
+    types = list(grid.types)
+    type_ids = dict(grid.type_ids)
+    for tile in offgrid_tiles:
+        if tile['type'] not in type_ids:
+            type_ids[tile['type']] = len(types)
+            types.append(tile['type'])
+
+    keys = sorted(grid.chunks)
+    out = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, tile_size, grid.chunk_size, len(types), len(keys), len(offgrid_tiles)))
+    for name in types:
+        encoded = name.encode('utf-8')
+        out += struct.pack('<B', len(encoded)) + encoded
+    for key in keys:
+        out += CHUNK_KEY.pack(key[0], key[1])
+    for key in keys:
+        chunk = grid.chunks[key]
+        if sys.byteorder == 'big':
+            chunk = array('H', chunk)
+            chunk.byteswap()
+        out += chunk.tobytes()
+    for tile in offgrid_tiles:
+        out += OFFGRID.pack(type_ids[tile['type']], tile['variant'], tile['pos'][0], tile['pos'][1])
+
+    f = open(path, 'wb')
+    f.write(out)
+    f.close()
+
+def read_map(path):
+    """Return (tile_size, TileChunks, offgrid tile list) for a .bmap file."""
+    f = open(path, 'rb')
+    try:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+    try:
+        magic, version, tile_size, chunk_size, type_count, chunk_count, offgrid_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary map")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has unsupported map version {version}")
+        cursor = HEADER.size
+
+        types = []
+        for i in range(type_count):
+            length = data[cursor]
+            types.append(data[cursor + 1:cursor + 1 + length].decode('utf-8'))
+            cursor += 1 + length
+
+        grid = TileChunks(chunk_size)
+        for name in types:
+            grid.type_id(name)
+
+        keys = [CHUNK_KEY.unpack_from(data, cursor + i * CHUNK_KEY.size) for i in range(chunk_count)]
+        cursor += chunk_count * CHUNK_KEY.size
+        chunk_bytes = 2 * chunk_size * chunk_size
+        for key in keys:
+            chunk = array('H')
+            chunk.frombytes(data[cursor:cursor + chunk_bytes])
+            if sys.byteorder == 'big':
+                chunk.byteswap()
+            grid.put_chunk(key, chunk)
+            cursor += chunk_bytes
+
+        offgrid_tiles = []
+        for type_index, variant, x, y in OFFGRID.iter_unpack(data[cursor:cursor + offgrid_count * OFFGRID.size]):
+            offgrid_tiles.append({'type': types[type_index], 'variant': variant, 'pos': [x, y]})
+    finally:
+        data.close()
+
+    return tile_size, grid, offgrid_tiles
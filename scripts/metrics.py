@@ -0,0 +1,87 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pygame
+
+METRICS_CACHE = os.path.join('data', 'sprite_metrics.json')
+METRICS_VERSION = 1
+
+def opaque_pixels(surf):
+    """(w, h) bool array of the pixels that are drawn when surf is blitted.
+
+    Uses the colorkey when there is one, then the alpha channel, and treats
+    pure black as transparent on plain surfaces (matching how load_image keys them).
+    """
+    colorkey = surf.get_colorkey()
+    if colorkey is not None:
+        return (pygame.surfarray.array3d(surf) != colorkey[:3]).any(axis=2)
+    if surf.get_flags() & pygame.SRCALPHA:
+        return pygame.surfarray.array_alpha(surf) != 0
+    return pygame.surfarray.array3d(surf).any(axis=2)
+
+def surface_metrics(surf):
+    """Bounding box of the visible pixels plus the bottom row / baseline, in one vectorized pass.
+
+    Returns {'size': [w, h], 'bbox': [x, y, w, h] or None, 'bottom': lowest
+    visible row (-1 if empty), 'baseline': transparent rows below it}.
+    """
+    w, h = surf.get_size()
+    if not w or not h:
+        return {'size': [w, h], 'bbox': None, 'bottom': -1, 'baseline': 0}
+    opaque = opaque_pixels(surf)
+    cols = np.flatnonzero(opaque.any(axis=1))
+    rows = np.flatnonzero(opaque.any(axis=0))
+    if not len(rows):
+        return {'size': [w, h], 'bbox': None, 'bottom': -1, 'baseline': 0}
+    x1, x2, y1, y2 = int(cols[0]), int(cols[-1]), int(rows[0]), int(rows[-1])
+    return {'size': [w, h], 'bbox': [x1, y1, x2 - x1 + 1, y2 - y1 + 1], 'bottom': y2, 'baseline': h - 1 - y2}
+
+class MetricsCache:
+    """Sprite metrics kept on disk, keyed by source file, its mtime and the frame size.
+
+    Frames are only scanned the first time a file (or a new version of it)
+    is seen; afterwards the numbers come straight from the cache file.
+    """
+    def __init__(self, path=METRICS_CACHE):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == METRICS_VERSION:
+                self.entries = data['entries']
+        except Exception:
+            pass
+
+    def get(self, source, surf):
+        """Metrics for surf, which was loaded from the file at source (and possibly scaled)."""
+        try:
+            mtime = os.stat(source).st_mtime_ns
+        except OSError:
+            return surface_metrics(surf)
+        key = '%s@%dx%d' % (source.replace(os.sep, '/'), surf.get_width(), surf.get_height())
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+        metrics = surface_metrics(surf)
+        with self.lock:
+            self.entries[key] = [mtime, metrics]
+            self.dirty = True
+        return metrics
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': METRICS_VERSION, 'entries': self.entries}, f)
+                self.dirty = False
+            except Exception:
+                # the cache is only an optimization
+                pass
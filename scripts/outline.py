@@ -0,0 +1,49 @@
+import weakref
+
+import pygame
+
+OUTLINE_COLOR = (0, 0, 0, 180)
+OUTLINE_OFFSETS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+class Outline:
+    """Dark outline drawn behind everything on the world layer.
+
+    Instead of building a mask of the whole display every frame, each sprite
+    adds its own silhouette to a shared layer as it is drawn. Callers pass
+    the surface they actually blitted, so a flipped or scaled sprite comes
+    from Game.transforms and is never transformed again here. Silhouettes
+    are cached per image, so animation frames, their cached transforms and
+    baked tile chunks are only converted once; a cache entry goes away with
+    its image. Silhouettes are merged with BLEND_RGBA_MAX so overlapping sprites
+    shade the same as a single mask of the display would.
+    """
+    def __init__(self, size, color=OUTLINE_COLOR, offsets=OUTLINE_OFFSETS):
+        self.color = color
+        self.offsets = offsets
+        self.layer = pygame.Surface(size, pygame.SRCALPHA)
+        self.layer.fill((0, 0, 0, 0))
+        # image -> silhouette surface
+        self.silhouettes = weakref.WeakKeyDictionary()
+
+    def clear(self):
+        self.layer.fill((0, 0, 0, 0))
+
+    def silhouette(self, img):
+        shape = self.silhouettes.get(img)
+        if shape is None:
+            shape = self.silhouettes[img] = pygame.mask.from_surface(img).to_surface(setcolor=self.color, unsetcolor=(0, 0, 0, 0))
+        return shape
+
+    def add(self, img, pos):
+        """Add the silhouette of img (the surface exactly as it was blitted) at pos."""
+        self.layer.blit(self.silhouette(img), pos, special_flags=pygame.BLEND_RGBA_MAX)
+
+    def add_rect(self, rect):
+        pygame.draw.rect(self.layer, self.color, rect)
+
+    def add_polygon(self, points):
+        pygame.draw.polygon(self.layer, self.color, points)
+
+    def render(self, surf):
+        for offset in self.offsets:
+            surf.blit(self.layer, offset)
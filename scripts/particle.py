@@ -1,25 +1,101 @@
-class Particle:
-    def __init__(self, game, p_type, pos, velocity=[0, 0], frame=0):
+import numpy as np
+
+DEFAULT_MAX_PARTICLES = 1024
+
+class ParticleSystem:
+    """Fixed-capacity pool holding every particle as NumPy arrays.
+
+    Particle kinds ('leaf', 'particle', ...) come from the game's
+    'particle/<kind>' animations and are registered on first spawn. Once
+    max_particles are alive new spawns are dropped (counted in dropped)
+    instead of allocating more.
+    """
+    def __init__(self, game, max_particles=DEFAULT_MAX_PARTICLES):
         self.game = game
-        self.type = p_type
-        self.pos = list(pos)
-        self.velocity = list(velocity)
-        self.animation = self.game.assets['particle/' + p_type].copy()
-        self.animation.frame = frame
-    
+        self.max_particles = max_particles
+        self.pos = np.zeros((max_particles, 2))
+        self.vel = np.zeros((max_particles, 2))
+        self.frame = np.zeros(max_particles, dtype=np.int32)
+        self.kind = np.zeros(max_particles, dtype=np.int16)
+        self.done = np.zeros(max_particles, dtype=bool)
+        self.count = 0
+        self.dropped = 0
+
+        # per kind: name -> index, and lookup tables indexed by kind
+        self.kind_ids = {}
+        self.kind_names = []
+        self.img_duration = np.zeros(0, dtype=np.int32)
+        self.last_frame = np.zeros(0, dtype=np.int32)
+        self.loop = np.zeros(0, dtype=bool)
+        self.first_image = np.zeros(0, dtype=np.int32)
+        # flat list of every kind's frames, plus their half sizes for centering
+        self.images = []
+        self.half_size = np.zeros((0, 2))
+
+    def __len__(self):
+        return self.count
+
+    def kind_id(self, p_type):
+        if p_type not in self.kind_ids:
+            animation = self.game.assets['particle/' + p_type]
+            self.kind_ids[p_type] = len(self.kind_names)
+            self.kind_names.append(p_type)
+            self.img_duration = np.append(self.img_duration, animation.img_duration)
+            self.last_frame = np.append(self.last_frame, animation.img_duration * len(animation.images) - 1)
+            self.loop = np.append(self.loop, animation.loop)
+            self.first_image = np.append(self.first_image, len(self.images))
+            self.images.extend(animation.images)
+            halves = [(img.get_width() // 2, img.get_height() // 2) for img in animation.images]
+            self.half_size = np.concatenate([self.half_size, np.array(halves, dtype=float).reshape(-1, 2)])
+        return self.kind_ids[p_type]
+
+    def spawn(self, p_type, pos, velocity=(0, 0), frame=0):
+        if self.count >= self.max_particles:
+            self.dropped += 1
+            return False
+        i = self.count
+        self.kind[i] = self.kind_id(p_type)
+        self.pos[i] = pos
+        self.vel[i] = velocity
+        self.frame[i] = frame
+        self.done[i] = False
+        self.count += 1
+        return True
+
+    def clear(self):
+        self.count = 0
+
     def update(self):
-        kill = False
-        if self.animation.done:
-            kill = True
-        
-        self.pos[0] += self.velocity[0]
-        self.pos[1] += self.velocity[1]
-        
-        self.animation.update()
-        
+        """Advance every particle; returns the mask of particles to kill after rendering."""
+        n = self.count
+        kill = self.done[:n].copy()
+        self.pos[:n] += self.vel[:n]
+        kind = self.kind[:n]
+        last = self.last_frame[kind]
+        loop = self.loop[kind]
+        # same stepping as Animation.frame_at: looping kinds wrap, the rest stop on the last frame
+        frame = np.where(loop, (self.frame[:n] + 1) % (last + 1), np.minimum(self.frame[:n] + 1, last))
+        self.frame[:n] = frame
+        self.done[:n] |= ~loop & (frame >= last)
         return kill
-    
+
     def render(self, surf, offset=(0, 0)):
-        img = self.animation.img()
-        surf.blit(img, (self.pos[0] - offset[0] - img.get_width() // 2, self.pos[1] - offset[1] - img.get_height() // 2))
-    
\ No newline at end of file
+        n = self.count
+        if not n:
+            return
+        kind = self.kind[:n]
+        image = self.first_image[kind] + self.frame[:n] // self.img_duration[kind]
+        dest = self.pos[:n] - offset - self.half_size[image]
+        images = self.images
+        surf.blits([(images[i], d) for i, d in zip(image.tolist(), dest.tolist())], doreturn=False)
+
+    def kill(self, mask):
+        # entries spawned after mask was computed (past its end) are kept
+        keep = np.ones(self.count, dtype=bool)
+        keep[:len(mask)] = ~mask
+        n = int(keep.sum())
+        if n == self.count:
+            return
+        for field in (self.pos, self.vel, self.frame, self.kind, self.done):
+            field[:n] = field[:self.count][keep]
+        self.count = n
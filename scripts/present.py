@@ -0,0 +1,115 @@
+import numpy as np
+import pygame
+
+class Presenter:
+    """Puts the low-res composite (Game.display_2) on the window.
+
+    The scaled frame goes into a surface allocated once (or straight into
+    the window when the formats allow it) instead of a new surface per
+    frame. The composite is compared with the last presented one in blocks
+    of block_size pixels, and only the window areas of changed blocks are
+    passed to pygame.display.update; an unchanged frame is not pushed at
+    all.
+    """
+    def __init__(self, window, source_size, block_size=(32, 24)):
+        self.window = window
+        self.source_size = source_size
+        self.block_size = block_size
+        self.scaled = None
+        self.direct = True
+        self.previous = None
+        # preallocated copy of the last presented frame (previous points at it once it is valid)
+        self.buffer = None
+        self.diff = None
+        self.block_rects = None
+        self.window_size = window.get_size()
+
+    def invalidate(self):
+        """Push the next frame in full (window exposed, resized, or drawn over by something else)."""
+        self.previous = None
+
+    def window_rects(self):
+        """Window rect of every source block, grown by one scaled pixel to cover rounding."""
+        w, h = self.source_size
+        bw, bh = self.block_size
+        ww, wh = self.window.get_size()
+        pad_x, pad_y = -(-ww // w), -(-wh // h)
+        rects = {}
+        for by in range(h // bh):
+            for bx in range(w // bw):
+                x1, y1 = bx * bw * ww // w, by * bh * wh // h
+                x2, y2 = (bx + 1) * bw * ww // w, (by + 1) * bh * wh // h
+                rects[bx, by] = pygame.Rect(x1 - pad_x, y1 - pad_y, x2 - x1 + pad_x * 2, y2 - y1 + pad_y * 2).clip(self.window.get_rect())
+        return rects
+
+    def dirty_rects(self, source):
+        """Window rects covering the blocks that changed since the last frame, or None for everything."""
+        pixels = pygame.surfarray.pixels2d(source)
+        w, h = self.source_size
+        bw, bh = self.block_size
+        previous = self.previous
+        if previous is None or previous.shape != pixels.shape or w % bw or h % bh:
+            # first frame (or a new size): allocate the copy of the last frame once
+            if self.buffer is None or self.buffer.shape != pixels.shape:
+                self.buffer = np.empty_like(pixels)
+                self.diff = np.empty(pixels.shape, dtype=bool)
+            np.copyto(self.buffer, pixels)
+            self.previous = self.buffer
+            return None
+        np.not_equal(pixels, previous, out=self.diff)
+        changed = self.diff.reshape(w // bw, bw, h // bh, bh).any(axis=(1, 3))
+        np.copyto(previous, pixels)
+        del pixels
+        if changed.all():
+            return None
+        if self.block_rects is None:
+            self.block_rects = self.window_rects()
+        rects = []
+        # merge runs of changed blocks along each row into one rect
+        for by in range(changed.shape[1]):
+            row = changed[:, by]
+            bx = 0
+            while bx < len(row):
+                if not row[bx]:
+                    bx += 1
+                    continue
+                start = bx
+                while bx < len(row) and row[bx]:
+                    bx += 1
+                rects.append(self.block_rects[start, by].union(self.block_rects[bx - 1, by]))
+        return rects
+
+    def present(self, source, offset=(0, 0)):
+        """Scale source onto the window at offset and update the changed part; False if nothing changed."""
+        size = self.window.get_size()
+        if size != self.window_size:
+            self.window_size = size
+            self.block_rects = None
+            self.previous = None
+        shaking = offset[0] or offset[1]
+        if shaking:
+            # the shifted frame leaves last frame's pixels at the edges, as before; it is never diffed against
+            self.previous = None
+            rects = None
+        else:
+            rects = self.dirty_rects(source)
+            if rects == []:
+                return False
+
+        if self.direct and not shaking:
+            try:
+                pygame.transform.scale(source, size, self.window)
+            except ValueError:
+                # window format differs from the composite; go through the preallocated surface from now on
+                self.direct = False
+        if not self.direct or shaking:
+            if self.scaled is None or self.scaled.get_size() != size:
+                self.scaled = pygame.Surface(size, 0, source)
+            pygame.transform.scale(source, size, self.scaled)
+            self.window.blit(self.scaled, offset)
+
+        if rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(rects)
+        return True
@@ -0,0 +1,136 @@
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+from scripts.ui import get_font, render_text
+
+# bucket upper bounds (ms) for the per-phase histograms; the last bucket is open-ended
+HISTOGRAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33)
+
+class FrameProfiler:
+    """Splits each frame into named phases and keeps the last `history` frames.
+
+    The game calls mark(name) at the end of each phase; the time since the
+    previous mark is added to that phase, so phases that run several times
+    a frame (the simulation ticks) are summed. While disabled every call
+    returns immediately.
+    """
+    def __init__(self, history=300, enabled=False):
+        self.enabled = enabled
+        self.frames = deque(maxlen=history)
+        self.phases = []
+        self.current = None
+        self.last = 0.0
+        # the overlay recomputes its numbers and redraws its panel every `overlay_interval`
+        # seconds; other frames only blit the kept panel, so it barely shows in what it measures
+        self.overlay_interval = 0.25
+        self.overlay_time = 0.0
+        self.panel = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current = None
+        self.panel = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.current = {}
+        self.last = time.perf_counter()
+
+    def mark(self, name):
+        if self.current is None:
+            return
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + (now - self.last) * 1000
+        self.last = now
+        if name not in self.phases:
+            self.phases.append(name)
+
+    def end_frame(self):
+        if self.current is None:
+            return
+        self.frames.append(self.current)
+        self.current = None
+
+    def samples(self, name):
+        return [frame.get(name, 0.0) for frame in self.frames]
+
+    def stats(self):
+        """{phase: {'mean', 'p50', 'p95', 'max', 'histogram'}} in ms over the kept frames, plus 'total'."""
+        result = {}
+        for name in self.phases + ['total']:
+            if name == 'total':
+                values = sorted(sum(frame.values()) for frame in self.frames)
+            else:
+                values = sorted(self.samples(name))
+            if not values:
+                continue
+            histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+            for v in values:
+                i = 0
+                while i < len(HISTOGRAM_BUCKETS) and v > HISTOGRAM_BUCKETS[i]:
+                    i += 1
+                histogram[i] += 1
+            result[name] = {
+                'mean': sum(values) / len(values),
+                'p50': values[len(values) // 2],
+                'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+                'max': values[-1],
+                'histogram': histogram,
+            }
+        return result
+
+    def export_csv(self, path):
+        """One row per kept frame, one column (ms) per phase."""
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame'] + self.phases + ['total'])
+            for i, frame in enumerate(self.frames):
+                row = [frame.get(name, 0.0) for name in self.phases]
+                writer.writerow([i] + ['%.4f' % v for v in row] + ['%.4f' % sum(row)])
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'buckets_ms': list(HISTOGRAM_BUCKETS), 'phases': self.phases, 'stats': self.stats(),
+                       'frames': list(self.frames)}, f, indent=1)
+
+    def export(self, basename):
+        """Write basename.csv and basename.json; returns the two paths."""
+        self.export_csv(basename + '.csv')
+        self.export_json(basename + '.json')
+        return basename + '.csv', basename + '.json'
+
+    def render(self, surf, pos=(4, 30)):
+        """Draw mean / p95 (ms) per phase over the kept frames."""
+        if not self.enabled or not self.frames:
+            return
+        now = time.perf_counter()
+        if self.panel is None or now - self.overlay_time >= self.overlay_interval:
+            self.overlay_time = now
+            self.redraw_panel(self.stats())
+        surf.blit(self.panel, pos)
+
+    def redraw_panel(self, stats):
+        font = get_font(12)
+        rows = [('phase', 'mean', 'p95')]
+        rows.extend((name, '%.2f' % s['mean'], '%.2f' % s['p95']) for name, s in stats.items())
+        line_h = font.get_linesize()
+        size = (156, line_h * len(rows) + 4)
+        # one panel, reallocated only when the number of phases changes
+        if self.panel is None or self.panel.get_size() != size:
+            self.panel = pygame.Surface(size, pygame.SRCALPHA)
+        panel = self.panel
+        panel.fill((0, 0, 0, 160))
+        for i, row in enumerate(rows):
+            color = (255, 215, 0) if i == 0 else (255, 255, 255)
+            y = 2 + line_h * i
+            # phase names and the header repeat every redraw, so they come from the shared text cache
+            panel.blit(render_text(font, row[0], False, color), (2, y))
+            # numbers right-aligned in two columns
+            for text, right in zip(row[1:], (122, 153)):
+                img = render_text(font, text, False, color) if i == 0 else font.render(text, False, color)
+                panel.blit(img, (right - img.get_width(), y))
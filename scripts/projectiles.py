@@ -0,0 +1,89 @@
+import numpy as np
+
+OWNER_ENEMY = 0
+OWNER_PLAYER = 1
+OWNER_BOSS = 2
+
+class ProjectileSystem:
+    """All live projectiles as preallocated NumPy arrays (struct of arrays).
+
+    Slots 0..count-1 are live and kept in spawn order. kill() compacts the
+    survivors to the front in one pass instead of removing them one by one.
+    """
+    def __init__(self, capacity=256, max_age=360):
+        self.max_age = max_age
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.owner = np.zeros(capacity, dtype=np.int8)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def grow(self):
+        capacity = len(self.age) * 2
+        self.pos = np.resize(self.pos, (capacity, 2))
+        self.vel = np.resize(self.vel, (capacity, 2))
+        self.age = np.resize(self.age, capacity)
+        self.owner = np.resize(self.owner, capacity)
+
+    def spawn(self, pos, velocity, owner=OWNER_ENEMY):
+        """Add a projectile and return its position as a list (handy for spawn effects)."""
+        if self.count == len(self.age):
+            self.grow()
+        i = self.count
+        self.pos[i] = pos
+        self.vel[i] = velocity
+        self.age[i] = 0
+        self.owner[i] = owner
+        self.count += 1
+        return [float(pos[0]), float(pos[1])]
+
+    def clear(self):
+        self.count = 0
+
+    def update(self):
+        n = self.count
+        self.pos[:n] += self.vel[:n]
+        self.age[:n] += 1
+
+    def expired(self):
+        return self.age[:self.count] > self.max_age
+
+    def hit_matrix(self, rects):
+        """(projectiles x rects) bool array, matching pygame.Rect.collidepoint for each pair."""
+        n = self.count
+        if not rects or not n:
+            return np.zeros((n, len(rects)), dtype=bool)
+        bounds = np.array([(r.left, r.top, r.right, r.bottom) for r in rects])
+        # Rect.collidepoint truncates float coordinates toward zero
+        px = np.trunc(self.pos[:n, 0])[:, None]
+        py = np.trunc(self.pos[:n, 1])[:, None]
+        return (px >= bounds[:, 0]) & (px < bounds[:, 2]) & (py >= bounds[:, 1]) & (py < bounds[:, 3])
+
+    def solid(self, tilemap):
+        n = self.count
+        return tilemap.solid_points(self.pos[:n, 0], self.pos[:n, 1])
+
+    def kill(self, mask):
+        # entries spawned after mask was computed (past its end) are kept
+        keep = np.ones(self.count, dtype=bool)
+        keep[:len(mask)] = ~mask
+        n = int(keep.sum())
+        if n == self.count:
+            return
+        for field in (self.pos, self.vel, self.age, self.owner):
+            field[:n] = field[:self.count][keep]
+        self.count = n
+
+    def render(self, surf, img, offset=(0, 0), outline=None):
+        n = self.count
+        if not n:
+            return
+        draw = self.pos[:n] - (img.get_width() / 2, img.get_height() / 2) - offset
+        blits = [(img, pos) for pos in draw.tolist()]
+        surf.blits(blits, doreturn=False)
+        if outline:
+            for _, pos in blits:
+                outline.add(img, pos)
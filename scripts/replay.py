@@ -0,0 +1,105 @@
+import json
+
+import pygame
+
+from scripts.headless import key_event
+
+REPLAY_VERSION = 1
+# how often (in ticks) a recording stores a snapshot of the player/enemy state
+CHECK_INTERVAL = 60
+
+KEY_NAMES = {value: name[2:] for name, value in vars(pygame).items() if name.startswith('K_')}
+
+def encode_event(event):
+    """Compact [kind, *args] entry for an input event, or None if the game ignores it."""
+    if event.type in (pygame.KEYDOWN, pygame.KEYUP) and event.key in KEY_NAMES:
+        return ['down' if event.type == pygame.KEYDOWN else 'up', KEY_NAMES[event.key]]
+    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+        return ['click', event.pos[0], event.pos[1]]
+    return None
+
+def decode_event(kind, *args):
+    if kind == 'click':
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=tuple(args))
+    return key_event(kind, args[0])
+
+def snapshot(game):
+    """State compared between a recording and its replay to spot desyncs."""
+    return [game.tick, game.level, game.player.pos[0], game.player.pos[1], game.player.hits, len(game.enemies)]
+
+class Recorder:
+    """Captures a play session as its seed plus the input applied before each tick.
+
+    Game.handle_events passes every event to capture() and Game.update
+    calls after_tick(), so the same recorder works for windowed play and
+    for replays run through play_replay.
+    """
+    def __init__(self, game):
+        self.header = {
+            'version': REPLAY_VERSION,
+            'seed': game.seed,
+            'level': game.level,
+            'character': game.player.type,
+            # carried over from the previous session, unlike position and hits
+            'items': [game.player.shuriken_count, game.player.kunai_count],
+            'tick_rate': game.tick_rate,
+        }
+        self.events = []
+        self.checks = []
+        self.ticks = 0
+
+    def capture(self, tick, event):
+        entry = encode_event(event)
+        if entry is not None:
+            self.events.append([tick] + entry)
+
+    def after_tick(self, game):
+        self.ticks = game.tick
+        if game.tick % CHECK_INTERVAL == 0:
+            self.checks.append(snapshot(game))
+
+    def data(self):
+        data = dict(self.header)
+        data.update({'ticks': self.ticks, 'events': self.events, 'checks': self.checks})
+        return data
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.data(), f, separators=(',', ':'))
+
+def load_replay(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        replay = json.load(f)
+    if replay.get('version') != REPLAY_VERSION:
+        raise ValueError(f"{path}: unsupported replay version {replay.get('version')}")
+    return replay
+
+def play_replay(game, replay):
+    """Re-run a recorded session tick for tick (no drawing, as fast as possible).
+
+    Returns (ticks run, list of (recorded, replayed) snapshots that differ).
+    """
+    inputs = {}
+    for tick, *entry in replay['events']:
+        inputs.setdefault(tick, []).append(decode_event(*entry))
+    game.level = replay['level']
+    game.apply_character_choice(replay['character'])
+    game.player.shuriken_count, game.player.kunai_count = replay['items']
+    game.start_session(replay['seed'])
+    recorder = game.recorder = Recorder(game)
+    try:
+        while game.tick < replay['ticks']:
+            events = inputs.pop(game.tick, None)
+            if events:
+                game.handle_events(events)
+            if game.paused:
+                # ticks stop while paused, so every event up to the unpause shares one tick;
+                # still paused here means the session ended paused
+                break
+            game.update()
+    finally:
+        game.recorder = None
+    mismatches = [(a, b) for a, b in zip(replay['checks'], recorder.checks) if a != b]
+    if len(recorder.checks) < len(replay['checks']):
+        mismatches.append((replay['checks'][len(recorder.checks)], None))
+    return game.tick, mismatches
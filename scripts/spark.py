@@ -1,26 +1,75 @@
 import math
 
+import numpy as np
 import pygame
 
-class Spark:
-    def __init__(self, pos, angle, speed):
-        self.pos = list(pos)
-        self.angle = angle
-        self.speed = speed
-        
+# polygon corners relative to the spark angle, and how far each sits from the center (times speed)
+CORNER_ANGLES = (0, math.pi * 0.5, math.pi, -math.pi * 0.5)
+CORNER_SCALES = np.array([3, 0.5, 3, 0.5])
+
+class SparkField:
+    """Every live spark held in NumPy arrays.
+
+    A spark's angle never changes, so the unit vectors for its heading and
+    four polygon corners are worked out once at spawn. Each frame the
+    positions, speed decay and all polygon vertices are computed for the
+    whole field in one pass and the polygons are drawn from that buffer.
+    """
+    def __init__(self, capacity=256, color=(255, 255, 255)):
+        self.color = color
+        self.pos = np.zeros((capacity, 2))
+        self.speed = np.zeros(capacity)
+        # per spark: unit vectors for CORNER_ANGLES (the first one is the heading)
+        self.corners = np.zeros((capacity, 4, 2))
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def grow(self):
+        capacity = len(self.speed) * 2
+        self.pos = np.resize(self.pos, (capacity, 2))
+        self.speed = np.resize(self.speed, capacity)
+        self.corners = np.resize(self.corners, (capacity, 4, 2))
+
+    def spawn(self, pos, angle, speed):
+        if self.count == len(self.speed):
+            self.grow()
+        i = self.count
+        self.pos[i] = pos
+        self.speed[i] = speed
+        self.corners[i] = [(math.cos(angle + corner), math.sin(angle + corner)) for corner in CORNER_ANGLES]
+        self.count += 1
+
+    def clear(self):
+        self.count = 0
+
     def update(self):
-        self.pos[0] += math.cos(self.angle) * self.speed
-        self.pos[1] += math.sin(self.angle) * self.speed
-        
-        self.speed = max(0, self.speed - 0.1)
-        return not self.speed
-    
-    def render(self, surf, offset=(0, 0)):
-        render_points = [
-            (self.pos[0] + math.cos(self.angle) * self.speed * 3 - offset[0], self.pos[1] + math.sin(self.angle) * self.speed * 3 - offset[1]),
-            (self.pos[0] + math.cos(self.angle + math.pi * 0.5) * self.speed * 0.5 - offset[0], self.pos[1] + math.sin(self.angle + math.pi * 0.5) * self.speed * 0.5 - offset[1]),
-            (self.pos[0] + math.cos(self.angle + math.pi) * self.speed * 3 - offset[0], self.pos[1] + math.sin(self.angle + math.pi) * self.speed * 3 - offset[1]),
-            (self.pos[0] + math.cos(self.angle - math.pi * 0.5) * self.speed * 0.5 - offset[0], self.pos[1] + math.sin(self.angle - math.pi * 0.5) * self.speed * 0.5 - offset[1]),
-        ]
-        
-        pygame.draw.polygon(surf, (255, 255, 255), render_points)
\ No newline at end of file
+        """Move and slow every spark; returns the mask of sparks that have stopped."""
+        n = self.count
+        self.pos[:n] += self.corners[:n, 0] * self.speed[:n, None]
+        self.speed[:n] = np.maximum(0, self.speed[:n] - 0.1)
+        return self.speed[:n] == 0
+
+    def render(self, surf, offset=(0, 0), outline=None):
+        n = self.count
+        if not n:
+            return
+        points = self.pos[:n, None] + self.corners[:n] * self.speed[:n, None, None] * CORNER_SCALES[:, None] - offset
+        polygon = pygame.draw.polygon
+        color = self.color
+        for render_points in points.tolist():
+            polygon(surf, color, render_points)
+            if outline:
+                outline.add_polygon(render_points)
+
+    def kill(self, mask):
+        # entries spawned after mask was computed (past its end) are kept
+        keep = np.ones(self.count, dtype=bool)
+        keep[:len(mask)] = ~mask
+        n = int(keep.sum())
+        if n == self.count:
+            return
+        for field in (self.pos, self.speed, self.corners):
+            field[:n] = field[:self.count][keep]
+        self.count = n
@@ -0,0 +1,120 @@
+class SpatialGrid:
+    """Uniform grid of buckets for finding items by world-space rect.
+
+    Items can be any object (dicts included); they are tracked by identity.
+    An item is stored in every cell its rect touches, and queries return each
+    match once, in insertion order, so draw order is preserved.
+    """
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+        # id(item) -> (insertion seq, item, list of cell keys)
+        self.entries = {}
+        self.seq = 0
+
+    def cell_range(self, rect):
+        x, y, w, h = rect
+        size = self.cell_size
+        # a zero-sized rect still occupies the cell it sits in
+        return (int(x // size), int(y // size), int((x + max(w, 1) - 1) // size), int((y + max(h, 1) - 1) // size))
+
+    def insert(self, item, rect):
+        if id(item) in self.entries:
+            self.remove(item)
+        x1, y1, x2, y2 = self.cell_range(rect)
+        keys = []
+        for cx in range(x1, x2 + 1):
+            for cy in range(y1, y2 + 1):
+                self.cells.setdefault((cx, cy), []).append(item)
+                keys.append((cx, cy))
+        self.entries[id(item)] = (self.seq, item, keys)
+        self.seq += 1
+
+    def remove(self, item):
+        entry = self.entries.pop(id(item), None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            bucket = self.cells[key]
+            for i, other in enumerate(bucket):
+                if other is item:
+                    del bucket[i]
+                    break
+            if not bucket:
+                del self.cells[key]
+
+    def clear(self):
+        self.cells = {}
+        self.entries = {}
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def query(self, rect):
+        """Return the items whose cells overlap rect (a coarse, cell-level test)."""
+        x1, y1, x2, y2 = self.cell_range(rect)
+        found = {}
+        for cx in range(x1, x2 + 1):
+            for cy in range(y1, y2 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    for item in bucket:
+                        found[id(item)] = item
+        if len(found) > 1:
+            return sorted(found.values(), key=lambda item: self.entries[id(item)][0])
+        return list(found.values())
+
+    def query_point(self, pos):
+        bucket = self.cells.get((int(pos[0] // self.cell_size), int(pos[1] // self.cell_size)))
+        return list(bucket) if bucket else []
+
+class Broadphase:
+    """Spatial hash over the things that can hit each other during a tick.
+
+    Game rebuilds it once per tick after entities have moved (enemies, boss,
+    pickups), and the hit checks query it instead of scanning every list.
+    Each item keeps the rect it was registered with and a kind tag
+    ('enemy', 'boss', 'pickup', ...) so callers can filter queries.
+    """
+    def __init__(self, cell_size=32):
+        self.grid = SpatialGrid(cell_size)
+        self.rects = {}
+        self.kinds = {}
+
+    def clear(self):
+        self.grid.clear()
+        self.rects = {}
+        self.kinds = {}
+
+    def add(self, item, rect, kind):
+        self.grid.insert(item, rect)
+        self.rects[id(item)] = rect
+        self.kinds[id(item)] = kind
+
+    def remove(self, item):
+        self.grid.remove(item)
+        self.rects.pop(id(item), None)
+        self.kinds.pop(id(item), None)
+
+    def __len__(self):
+        return len(self.grid)
+
+    def query_rect(self, rect, kind=None):
+        """Return registered items overlapping rect, in registration order."""
+        hits = []
+        for item in self.grid.query(rect):
+            if kind is not None and self.kinds[id(item)] != kind:
+                continue
+            if self.rects[id(item)].colliderect(rect):
+                hits.append(item)
+        return hits
+
+    def query_point(self, pos, kind=None):
+        hits = []
+        for item in self.grid.query_point(pos):
+            if kind is not None and self.kinds[id(item)] != kind:
+                continue
+            if self.rects[id(item)].collidepoint(pos):
+                hits.append(item)
+        return hits
@@ -1,7 +1,13 @@
 import json
 
+import numpy as np
 import pygame
 
+from scripts.autotile import autotile_grid, build_lut, grid_region, pack_ids
+from scripts.chunks import TileChunks
+from scripts.mapformat import MAP_EXT, read_map, write_map
+from scripts.spatial import SpatialGrid
+
 AUTOTILE_MAP = {
     tuple(sorted([(1, 0), (0, 1)])): 0,
     tuple(sorted([(1, 0), (0, 1), (-1, 0)])): 1,
@@ -17,31 +23,116 @@ AUTOTILE_MAP = {
 NEIGHBOR_OFFSETS = [(-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (0, 0), (-1, 1), (0, 1), (1, 1)]
 PHYSICS_TILES = {'grass', 'stone'}
 AUTOTILE_TYPES = {'grass', 'stone'}
+AUTOTILE_LUT = build_lut(AUTOTILE_MAP)
 
 class Tilemap:
     def __init__(self, game, tile_size=16):
         self.game = game
         self.tile_size = tile_size
-        self.tilemap = {}
+        # on-grid tiles, keyed by integer tile coordinates (see scripts/chunks.py)
+        self.grid = TileChunks()
+        self.offgrid_tiles = []
+        # bucketed lookup over offgrid_tiles for viewport culling and region extracts
+        self.offgrid_index = SpatialGrid(cell_size=tile_size * 4)
+        # chunk key -> (grid version, baked surface, oversized tiles drawn separately)
+        self.chunk_cache = {}
+        # tile bounds (x1, y1, x2, y2) touched by set_tile/remove_tile since the last autotile
+        self.dirty_region = None
+        # (grid, grid revision, origin, bool array) for vectorized solid lookups
+        self.solid_cache = None
+
+    def clear(self):
+        self.grid.clear()
         self.offgrid_tiles = []
+        self.offgrid_index.clear()
+        self.chunk_cache = {}
+        self.dirty_region = None
+
+    def invalidate_render_cache(self):
+        """Drop every baked chunk (e.g. after tile assets are reloaded)."""
+        self.chunk_cache = {}
+
+    def tile_at(self, x, y):
+        """Return the on-grid tile at (x, y) as a map-format dict, or None."""
+        tile_id = self.grid.get(x, y)
+        if not tile_id:
+            return None
+        tile_type, variant = self.grid.unpack(tile_id)
+        return {'type': tile_type, 'variant': variant, 'pos': [x, y]}
+
+    def set_tile(self, x, y, tile_type, variant=0):
+        self.grid.set(x, y, self.grid.pack(tile_type, variant))
+        self.mark_dirty(x, y)
+
+    def remove_tile(self, x, y):
+        self.grid.remove(x, y)
+        self.mark_dirty(x, y)
+
+    def mark_dirty(self, x, y):
+        # an edit can change the variant of the tile and its four neighbors
+        if self.dirty_region is None:
+            self.dirty_region = (x - 1, y - 1, x + 1, y + 1)
+        else:
+            x1, y1, x2, y2 = self.dirty_region
+            self.dirty_region = (min(x1, x - 1), min(y1, y - 1), max(x2, x + 1), max(y2, y + 1))
+
+    def offgrid_rect(self, tile):
+        try:
+            w, h = self.game.assets[tile['type']][tile['variant']].get_size()
+        except Exception:
+            w = h = self.tile_size
+        return pygame.Rect(tile['pos'][0], tile['pos'][1], w, h)
+
+    def add_offgrid(self, tile):
+        self.offgrid_tiles.append(tile)
+        self.offgrid_index.insert(tile, self.offgrid_rect(tile))
+
+    def rebuild_offgrid_index(self):
+        """Re-index offgrid_tiles; call after editing the list directly."""
+        self.offgrid_index.clear()
+        for tile in self.offgrid_tiles:
+            self.offgrid_index.insert(tile, self.offgrid_rect(tile))
+
+    def tiles_in_rect(self, rect):
+        """Yield (x, y, tile_id) for on-grid tiles whose cell overlaps rect (world pixels)."""
+        for x in range(rect.left // self.tile_size, (rect.right - 1) // self.tile_size + 1):
+            for y in range(rect.top // self.tile_size, (rect.bottom - 1) // self.tile_size + 1):
+                tile_id = self.grid.get(x, y)
+                if tile_id:
+                    yield x, y, tile_id
         
-    def extract(self, id_pairs, keep=False):
+    def extract(self, id_pairs, keep=False, rect=None):
+        """Return copies of tiles matching id_pairs, removing them unless keep.
+
+        If rect (world pixels) is given only tiles overlapping it are looked at,
+        which only touches the index buckets and grid cells under the rect.
+        """
         matches = []
-        for tile in self.offgrid_tiles.copy():
+        if rect is None:
+            candidates = self.offgrid_tiles
+        else:
+            rect = pygame.Rect(rect)
+            candidates = [tile for tile in self.offgrid_index.query(rect) if rect.colliderect(self.offgrid_rect(tile))]
+        removed = []
+        for tile in candidates:
             if (tile['type'], tile['variant']) in id_pairs:
                 matches.append(tile.copy())
                 if not keep:
-                    self.offgrid_tiles.remove(tile)
-                    
-        for loc in self.tilemap:
-            tile = self.tilemap[loc]
-            if (tile['type'], tile['variant']) in id_pairs:
-                matches.append(tile.copy())
-                matches[-1]['pos'] = matches[-1]['pos'].copy()
-                matches[-1]['pos'][0] *= self.tile_size
-                matches[-1]['pos'][1] *= self.tile_size
+                    removed.append(tile)
+        if removed:
+            removed_ids = set()
+            for tile in removed:
+                self.offgrid_index.remove(tile)
+                removed_ids.add(id(tile))
+            self.offgrid_tiles = [tile for tile in self.offgrid_tiles if id(tile) not in removed_ids]
+
+        cells = self.grid if rect is None else list(self.tiles_in_rect(rect))
+        for x, y, tile_id in cells:
+            tile_type, variant = self.grid.unpack(tile_id)
+            if (tile_type, variant) in id_pairs:
+                matches.append({'type': tile_type, 'variant': variant, 'pos': [x * self.tile_size, y * self.tile_size]})
                 if not keep:
-                    del self.tilemap[loc]
+                    self.grid.remove(x, y)
         
         return matches
     
@@ -49,58 +140,165 @@ class Tilemap:
         tiles = []
         tile_loc = (int(pos[0] // self.tile_size), int(pos[1] // self.tile_size))
         for offset in NEIGHBOR_OFFSETS:
-            check_loc = str(tile_loc[0] + offset[0]) + ';' + str(tile_loc[1] + offset[1])
-            if check_loc in self.tilemap:
-                tiles.append(self.tilemap[check_loc])
+            tile = self.tile_at(tile_loc[0] + offset[0], tile_loc[1] + offset[1])
+            if tile:
+                tiles.append(tile)
         return tiles
+
+    def import_json(self, map_data, index=True):
+        """Fill the map from the JSON map format ({'x;y': {'type', 'variant', 'pos'}}).
+
+        With index=False the off-grid index is left empty (it sizes tiles
+        from their images); call rebuild_offgrid_index on the main thread.
+        """
+        self.grid.clear()
+        for tile in map_data['tilemap'].values():
+            self.grid.set(int(tile['pos'][0]), int(tile['pos'][1]), self.grid.pack(tile['type'], tile['variant']))
+        self.tile_size = map_data['tile_size']
+        self.offgrid_tiles = map_data['offgrid']
+        self.offgrid_index = SpatialGrid(cell_size=self.tile_size * 4)
+        if index:
+            self.rebuild_offgrid_index()
+
+    def export_json(self):
+        tilemap = {}
+        for x, y, tile_id in self.grid:
+            tile_type, variant = self.grid.unpack(tile_id)
+            tilemap[str(x) + ';' + str(y)] = {'type': tile_type, 'variant': variant, 'pos': [x, y]}
+        return {'tilemap': tilemap, 'tile_size': self.tile_size, 'offgrid': self.offgrid_tiles}
     
     def save(self, path):
+        # .bmap paths use the binary format (scripts/mapformat.py), anything else JSON
+        if path.endswith(MAP_EXT):
+            write_map(path, self.tile_size, self.grid, self.offgrid_tiles)
+            return
         f = open(path, 'w')
-        json.dump({'tilemap': self.tilemap, 'tile_size': self.tile_size, 'offgrid': self.offgrid_tiles}, f)
+        json.dump(self.export_json(), f)
         f.close()
         
-    def load(self, path):
+    def load(self, path, index=True):
+        """Read a JSON or binary map; index=False skips the off-grid index (see import_json)."""
+        if path.endswith(MAP_EXT):
+            self.clear()
+            self.tile_size, self.grid, self.offgrid_tiles = read_map(path)
+            self.offgrid_index = SpatialGrid(cell_size=self.tile_size * 4)
+            if index:
+                self.rebuild_offgrid_index()
+            return
         f = open(path, 'r')
         map_data = json.load(f)
         f.close()
         
-        self.tilemap = map_data['tilemap']
-        self.tile_size = map_data['tile_size']
-        self.offgrid_tiles = map_data['offgrid']
+        self.import_json(map_data, index=index)
         
     def solid_check(self, pos):
-        tile_loc = str(int(pos[0] // self.tile_size)) + ';' + str(int(pos[1] // self.tile_size))
-        if tile_loc in self.tilemap:
-            if self.tilemap[tile_loc]['type'] in PHYSICS_TILES:
-                return self.tilemap[tile_loc]
+        tile_loc = (int(pos[0] // self.tile_size), int(pos[1] // self.tile_size))
+        tile_id = self.grid.get(tile_loc[0], tile_loc[1])
+        if tile_id and self.grid.tile_type(tile_id) in PHYSICS_TILES:
+            return self.tile_at(tile_loc[0], tile_loc[1])
     
+    def solid_grid(self):
+        """Return ((x1, y1), rows=y bool array) of physics tiles, rebuilt when the grid changes."""
+        cache = self.solid_cache
+        if cache is None or cache[0] is not self.grid or cache[1] != self.grid.revision:
+            region = grid_region(self.grid)
+            if region is None:
+                cache = (self.grid, self.grid.revision, (0, 0), np.zeros((0, 0), dtype=bool))
+            else:
+                codes = [self.grid.type_ids[name] + 1 for name in PHYSICS_TILES if name in self.grid.type_ids]
+                solid = np.isin(pack_ids(self.grid, *region) >> 8, codes)
+                cache = (self.grid, self.grid.revision, region[:2], solid)
+            self.solid_cache = cache
+        return cache[2], cache[3]
+
+    def solid_points(self, xs, ys):
+        """Vectorized solid_check: bool array for world positions given as NumPy arrays."""
+        (x1, y1), solid = self.solid_grid()
+        tx = np.floor_divide(xs, self.tile_size).astype(np.int64) - x1
+        ty = np.floor_divide(ys, self.tile_size).astype(np.int64) - y1
+        inside = (tx >= 0) & (tx < solid.shape[1]) & (ty >= 0) & (ty < solid.shape[0])
+        result = np.zeros(len(tx), dtype=bool)
+        result[inside] = solid[ty[inside], tx[inside]]
+        return result
+
     def physics_rects_around(self, pos):
         rects = []
-        for tile in self.tiles_around(pos):
-            if tile['type'] in PHYSICS_TILES:
-                rects.append(pygame.Rect(tile['pos'][0] * self.tile_size, tile['pos'][1] * self.tile_size, self.tile_size, self.tile_size))
+        tile_loc = (int(pos[0] // self.tile_size), int(pos[1] // self.tile_size))
+        for offset in NEIGHBOR_OFFSETS:
+            x = tile_loc[0] + offset[0]
+            y = tile_loc[1] + offset[1]
+            tile_id = self.grid.get(x, y)
+            if tile_id and self.grid.tile_type(tile_id) in PHYSICS_TILES:
+                rects.append(pygame.Rect(x * self.tile_size, y * self.tile_size, self.tile_size, self.tile_size))
         return rects
     
-    def autotile(self):
-        for loc in self.tilemap:
-            tile = self.tilemap[loc]
-            neighbors = set()
-            for shift in [(1, 0), (-1, 0), (0, -1), (0, 1)]:
-                check_loc = str(tile['pos'][0] + shift[0]) + ';' + str(tile['pos'][1] + shift[1])
-                if check_loc in self.tilemap:
-                    if self.tilemap[check_loc]['type'] == tile['type']:
-                        neighbors.add(shift)
-            neighbors = tuple(sorted(neighbors))
-            if (tile['type'] in AUTOTILE_TYPES) and (neighbors in AUTOTILE_MAP):
-                tile['variant'] = AUTOTILE_MAP[neighbors]
-
-    def render(self, surf, offset=(0, 0)):
-        for tile in self.offgrid_tiles:
-            surf.blit(self.game.assets[tile['type']][tile['variant']], (tile['pos'][0] - offset[0], tile['pos'][1] - offset[1]))
+    def autotile(self, region=None):
+        """Re-pick autotile variants for the whole map, or only region (x1, y1, x2, y2) in tiles."""
+        if region is None:
+            self.dirty_region = None
+        return autotile_grid(self.grid, AUTOTILE_TYPES, AUTOTILE_LUT, region)
+
+    def autotile_dirty(self):
+        """Autotile only the area edited through set_tile/remove_tile since the last call."""
+        region = self.dirty_region
+        self.dirty_region = None
+        if region is None:
+            return 0
+        return autotile_grid(self.grid, AUTOTILE_TYPES, AUTOTILE_LUT, region)
+
+    def chunk_surface(self, key):
+        """Return (surface, overflow) for a chunk, baking it again if its tiles changed.
+
+        Tiles whose image is bigger than a cell would be clipped at the chunk
+        edge, so they are returned in overflow as (img, pos) and drawn per frame.
+        """
+        version = self.grid.versions.get(key)
+        cached = self.chunk_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1], cached[2]
+
+        grid = self.grid
+        size = grid.chunk_size
+        chunk = grid.chunks[key]
+        # colorkeyed like the tile images, so a blit of the chunk matches per-tile blits
+        surf = pygame.Surface((size * self.tile_size, size * self.tile_size))
+        surf.fill((0, 0, 0))
+        surf.set_colorkey((0, 0, 0))
+        overflow = []
+        for i, tile_id in enumerate(chunk):
+            if not tile_id:
+                continue
+            tile_type, variant = grid.unpack(tile_id)
+            img = self.game.assets[tile_type][variant]
+            local = ((i % size) * self.tile_size, (i // size) * self.tile_size)
+            if img.get_width() > self.tile_size or img.get_height() > self.tile_size:
+                overflow.append((img, (key[0] * size * self.tile_size + local[0], key[1] * size * self.tile_size + local[1])))
+            else:
+                surf.blit(img, local)
+        self.chunk_cache[key] = (version, surf, overflow)
+        return surf, overflow
+
+    def render(self, surf, offset=(0, 0), outline=None):
+        for tile in self.offgrid_index.query((offset[0], offset[1], surf.get_width(), surf.get_height())):
+            img = self.game.assets[tile['type']][tile['variant']]
+            pos = (tile['pos'][0] - offset[0], tile['pos'][1] - offset[1])
+            surf.blit(img, pos)
+            if outline:
+                outline.add(img, pos)
             
-        for x in range(offset[0] // self.tile_size, (offset[0] + surf.get_width()) // self.tile_size + 1):
-            for y in range(offset[1] // self.tile_size, (offset[1] + surf.get_height()) // self.tile_size + 1):
-                loc = str(x) + ';' + str(y)
-                if loc in self.tilemap:
-                    tile = self.tilemap[loc]
-                    surf.blit(self.game.assets[tile['type']][tile['variant']], (tile['pos'][0] * self.tile_size - offset[0], tile['pos'][1] * self.tile_size - offset[1]))
\ No newline at end of file
+        chunk_px = self.grid.chunk_size * self.tile_size
+        for cx in range(offset[0] // chunk_px, (offset[0] + surf.get_width()) // chunk_px + 1):
+            for cy in range(offset[1] // chunk_px, (offset[1] + surf.get_height()) // chunk_px + 1):
+                if (cx, cy) not in self.grid.chunks:
+                    continue
+                chunk_surf, overflow = self.chunk_surface((cx, cy))
+                pos = (cx * chunk_px - offset[0], cy * chunk_px - offset[1])
+                surf.blit(chunk_surf, pos)
+                # the chunk's silhouette is cached with its baked surface and rebuilt when it is re-baked
+                if outline:
+                    outline.add(chunk_surf, pos)
+                for img, world_pos in overflow:
+                    pos = (world_pos[0] - offset[0], world_pos[1] - offset[1])
+                    surf.blit(img, pos)
+                    if outline:
+                        outline.add(img, pos)
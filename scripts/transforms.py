@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+import pygame
+
+DEFAULT_MAX_TRANSFORMS = 512
+
+class TransformCache:
+    """Bounded LRU cache of flipped/scaled copies of sprite frames.
+
+    Keys are (source surface identity, flip, size). Each entry keeps a
+    reference to its source so the id stays valid while it is cached. hits
+    and misses count lookups, for tuning max_size.
+    """
+    def __init__(self, max_size=DEFAULT_MAX_TRANSFORMS):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, img, flip=False, size=None):
+        """Return img scaled to size (when given) and then flipped horizontally."""
+        flip = bool(flip)
+        if size is not None and tuple(size) == img.get_size():
+            size = None
+        elif size is not None:
+            size = tuple(size)
+        if not flip and size is None:
+            return img
+        key = (id(img), flip, size)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] is img:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        out = img
+        if size is not None:
+            out = pygame.transform.scale(out, size)
+        if flip:
+            out = pygame.transform.flip(out, True, False)
+        self.entries[key] = (img, out)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return out
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
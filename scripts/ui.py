@@ -1,7 +1,72 @@
+from collections import OrderedDict
+
 import pygame
 
+DEFAULT_MAX_TEXTS = 256
+
+# one Font per size for the whole HUD (creating a Font is slow: it opens and parses the font file)
+FONTS = {}
+
+def get_font(size):
+    font = FONTS.get(size)
+    if font is None:
+        font = FONTS[size] = pygame.font.Font(None, size)
+    return font
+
+class TextCache:
+    """LRU cache of rendered text, keyed by (font, text, color, antialias).
+
+    Menus, overlays and the HUD draw the same strings every frame; render()
+    is a drop-in for font.render(text, antialias, color) that only
+    rasterizes a string the first time it is seen (or after it was evicted).
+    """
+    def __init__(self, max_size=DEFAULT_MAX_TEXTS):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, tuple(color), bool(antialias))
+        img = self.entries.get(key)
+        if img is not None:
+            self.entries.move_to_end(key)
+            return img
+        img = self.entries[key] = font.render(text, antialias, color)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return img
+
+    def clear(self):
+        self.entries.clear()
+
+# shared by every screen; callers must not draw onto the returned surfaces
+text_cache = TextCache()
+
+def render_text(font, text, antialias, color):
+    return text_cache.render(font, text, antialias, color)
+
+OVERLAYS = {}
+
+def overlay_surface(size, color):
+    """A translucent full-screen layer, filled once and reused (do not draw on it)."""
+    key = (tuple(size), tuple(color))
+    overlay = OVERLAYS.get(key)
+    if overlay is None:
+        overlay = OVERLAYS[key] = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill(color)
+    return overlay
+
 
 class HealthBar:
+    """Health bar with optional item counters, drawn in retained mode.
+
+    The bar and counters are drawn into a cached transparent surface that
+    is only redrawn when what it shows changes (hits, item counts, the
+    cooldown cover height or the icon images); every other frame is a
+    single blit. Scaled icons are cached, and texts go through text_cache.
+    """
+    # room around the bar for text that sticks out of it
+    MARGIN = 4
+
     def __init__(self, max_hits=5, pos=(4, 4), size=(60, 10), bg_color=(40, 40, 40), fg_color=(200, 30, 30), border_color=(255,255,255)):
         self.max_hits = max_hits
         self.pos = pos
@@ -9,12 +74,87 @@ class HealthBar:
         self.bg_color = bg_color
         self.fg_color = fg_color
         self.border_color = border_color
+        self.surface = None
+        self.area = None
+        self.state = None
+        self.icons = {}
+        self.covers = {}
+
+    def text(self, size, text):
+        return render_text(get_font(size), text, True, (255, 255, 255))
+
+    def icon(self, img, size):
+        entry = self.icons.get((id(img), size))
+        if entry is None or entry[0] is not img:
+            entry = self.icons[(id(img), size)] = (img, pygame.transform.scale(img, (size, size)))
+        return entry[1]
+
+    def cover(self, icon_size, cover_h):
+        """Translucent cooldown cover over the top cover_h rows of an icon."""
+        key = (icon_size, cover_h)
+        overlay = self.covers.get(key)
+        if overlay is None:
+            overlay = self.covers[key] = pygame.Surface((icon_size, icon_size), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 160), rect=(0, 0, icon_size, cover_h))
+        return overlay
 
     def render(self, surf, hits):
+        self.render_with_items(surf, hits)
+
+    def render_with_items(self, surf, hits, items: dict = None):
+        """Render the healthbar and (optionally) item counts below it.
+
+        items: dict like {'shuriken': 10, 'sword': 3}
+        """
+        items = self.item_entries(items)
+        state = (hits, tuple((key, count, cover_h, id(img)) for key, count, cover_h, img in items))
+        if state != self.state:
+            self.state = state
+            self.redraw(hits, items)
+        x, y = self.pos
+        surf.blit(self.surface, (x - self.MARGIN, y - self.MARGIN), self.area)
+
+    def item_entries(self, items):
+        """(key, count, cooldown cover height in pixels, image or None) per item."""
+        entries = []
+        icon_size = self.size[1]
+        for key, val in (items or {}).items():
+            # val may be int (count) or tuple (count, cooldown_ratio, image_surf)
+            count = 0
+            cooldown = 0
+            img = None
+            if isinstance(val, (list, tuple)):
+                if len(val) > 0:
+                    count = val[0]
+                if len(val) > 1:
+                    cooldown = val[1]
+                if len(val) > 2:
+                    img = val[2]
+            else:
+                count = val
+            cover_h = int(icon_size * cooldown) if cooldown and cooldown > 0 else 0
+            entries.append((key, count, cover_h, img))
+        return entries
+
+    def redraw(self, hits, items):
+        w, h = self.size
+        m = self.MARGIN
+        # wide enough for a long row of counters; only the part drawn on is blitted
+        size = (max(w, 200) + m * 2, h * 2 + 16 + m * 2)
+        if self.surface is None or self.surface.get_size() != size:
+            self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        surf = self.surface
+        surf.fill((0, 0, 0, 0))
+        right = self.draw_bar(surf, hits, m, m)
+        bottom = m + h
+        if items:
+            right, bottom = self.draw_items(surf, items, m, m + h + 4, right)
+        self.area = pygame.Rect(0, 0, right + m, bottom + m)
+
+    def draw_bar(self, surf, hits, x, y):
         # hits = number of times player was hit; health remaining = max_hits - hits
         remaining = max(0, self.max_hits - hits)
         w, h = self.size
-        x, y = self.pos
 
         # background
         pygame.draw.rect(surf, self.bg_color, (x, y, w, h))
@@ -29,60 +169,34 @@ class HealthBar:
         pygame.draw.rect(surf, self.border_color, (x, y, w, h), 1)
 
         # optional: draw numbers
+        right = x + w
         try:
-            font = pygame.font.Font(None, 12)
-            txt = font.render(f"{remaining}/{self.max_hits}", True, (255, 255, 255))
+            txt = self.text(12, f"{remaining}/{self.max_hits}")
             surf.blit(txt, (x + 2, y + (h - txt.get_height()) // 2))
+            right = max(right, x + 2 + txt.get_width())
         except Exception:
             # if fonts not initialized yet, ignore
             pass
+        return right
 
-    def render_with_items(self, surf, hits, items: dict = None):
-        """Render the healthbar and (optionally) item counts below it.
-
-        items: dict like {'shuriken': 10, 'sword': 3}
-        """
-        self.render(surf, hits)
-        if not items:
-            return
-
-        x, y = self.pos
-        w, h = self.size
-        # draw small labels under the healthbar
+    def draw_items(self, surf, items, x, off_y, right):
+        """Draw the counters in a row starting at (x, off_y); returns the (right, bottom) edge drawn to."""
+        h = self.size[1]
+        bottom = off_y + h
+        cur_x = x
         try:
-            font = pygame.font.Font(None, 14)
-            off_y = y + h + 4
             spacing = 6
-            cur_x = x
-            for key, val in items.items():
-                # val may be int (count) or tuple (count, cooldown_ratio, image_surf)
-                count = 0
-                cooldown = 0
-                img = None
-                if isinstance(val, (list, tuple)):
-                    if len(val) > 0:
-                        count = val[0]
-                    if len(val) > 1:
-                        cooldown = val[1]
-                    if len(val) > 2:
-                        img = val[2]
-                else:
-                    count = val
-
+            for key, count, cover_h, img in items:
                 # draw icon (image if available)
                 icon_size = h
                 if img:
                     try:
-                        icon_surf = pygame.transform.scale(img, (icon_size, icon_size))
-                        surf.blit(icon_surf, (cur_x, off_y))
+                        surf.blit(self.icon(img, icon_size), (cur_x, off_y))
                         # cooldown overlay: draw from top proportionally to cooldown (0..1)
-                        if cooldown and cooldown > 0:
-                            overlay = pygame.Surface((icon_size, icon_size), pygame.SRCALPHA)
-                            cover_h = int(icon_size * cooldown)
-                            overlay.fill((0, 0, 0, 160), rect=(0, 0, icon_size, cover_h))
-                            surf.blit(overlay, (cur_x, off_y))
+                        if cover_h:
+                            surf.blit(self.cover(icon_size, cover_h), (cur_x, off_y))
                         # draw count to the right of icon
-                        surf_txt = font.render(f"x{count}", True, (255, 255, 255))
+                        surf_txt = self.text(14, f"x{count}")
                         surf.blit(surf_txt, (cur_x + icon_size + 4, off_y + (icon_size - surf_txt.get_height()) // 2))
                         cur_x += icon_size + surf_txt.get_width() + spacing + 4
                         continue
@@ -99,9 +213,10 @@ class HealthBar:
                 else:
                     icon = key[0].upper()
 
-                text = f"{icon} x{count}"
-                surf_txt = font.render(text, True, (255, 255, 255))
+                surf_txt = self.text(14, f"{icon} x{count}")
                 surf.blit(surf_txt, (cur_x, off_y))
+                bottom = max(bottom, off_y + surf_txt.get_height())
                 cur_x += surf_txt.get_width() + spacing
         except Exception:
             pass
+        return max(right, cur_x), bottom
@@ -1,41 +1,200 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import pygame
 
+from scripts.atlas import load_atlas
+from scripts.metrics import surface_metrics
+
 BASE_IMG_PATH = 'data/images/'
+DECODE_WORKERS = min(4, os.cpu_count() or 1)
+
+# packed frames from tools/build_atlas.py, read on first use (False = not looked up yet, None = no atlas)
+atlas = False
+atlas_lock = threading.Lock()
+# worker threads that read and decode image files for load_images
+decode_pool = None
+decode_lock = threading.Lock()
+
+def get_atlas():
+    global atlas
+    with atlas_lock:
+        if atlas is False:
+            atlas = load_atlas()
+        return atlas
+
+def get_decode_pool():
+    global decode_pool
+    with decode_lock:
+        if decode_pool is None:
+            decode_pool = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix='decode')
+        return decode_pool
+
+def scale_to_height(img, height):
+    """Scale img to height, keeping its aspect ratio (no-op when height is None or already matches)."""
+    if height is None or img.get_height() == height:
+        return img
+    return pygame.transform.scale(img, (int(img.get_width() * (height / img.get_height())), height))
+
+def decode_image(full_path, height=None):
+    """Worker side of load_images: read, decode and scale a file, without converting it."""
+    return scale_to_height(pygame.image.load(full_path), height)
 
 def load_image(path):
-    img = pygame.image.load(BASE_IMG_PATH + path).convert()
+    packed = get_atlas()
+    img = packed.image(path, BASE_IMG_PATH + path) if packed else None
+    if img is None:
+        img = pygame.image.load(BASE_IMG_PATH + path).convert()
     img.set_colorkey((0, 0, 0))
     return img
 
-def load_images(path):
+def decode_single(path):
+    """Thread-safe half of load_image: the decoded file (not converted), or None when the atlas serves it."""
+    packed = get_atlas()
+    if packed and packed.has(path, BASE_IMG_PATH + path):
+        return None
+    return decode_image(BASE_IMG_PATH + path)
+
+def finish_image(path, decoded):
+    """Main-thread half of load_image: convert the output of decode_single and set the colorkey."""
+    if decoded is None:
+        return load_image(path)
+    img = decoded.convert()
+    img.set_colorkey((0, 0, 0))
+    return img
+
+def decode_images(path, height=None):
+    """Thread-safe half of load_images: decode and scale the frames the atlas does not serve.
+
+    Returns one entry per frame in name order: the unconverted surface, or
+    None where the atlas has the frame. Nothing here needs the display, so
+    it can run on a background thread; finish_images does the rest.
+    """
+    packed = get_atlas()
+    decoded = []
+    for name in sorted(os.listdir(BASE_IMG_PATH + path)):
+        full_path = BASE_IMG_PATH + path + '/' + name
+        if packed and packed.has(path + '/' + name, full_path):
+            decoded.append(None)
+        else:
+            decoded.append(decode_image(full_path, height))
+    return decoded
+
+def finish_images(path, decoded, height=None):
+    """Main-thread half of load_images: convert the output of decode_images and set the colorkey."""
+    names = sorted(os.listdir(BASE_IMG_PATH + path))
+    if len(names) != len(decoded):
+        # the folder changed since it was decoded
+        return load_images(path, height)
+    packed = get_atlas()
+    images = []
+    for name, img in zip(names, decoded):
+        full_path = BASE_IMG_PATH + path + '/' + name
+        if img is None:
+            img = packed.image(path + '/' + name, full_path) if packed else None
+            # stale since decode_images looked: read the file after all
+            img = scale_to_height(img, height) if img is not None else decode_image(full_path, height).convert()
+        else:
+            img = img.convert()
+        img.set_colorkey((0, 0, 0))
+        images.append(img)
+    return images
+
+def load_images(path, height=None):
+    """Load every frame in a folder, in name order, optionally scaled to height.
+
+    Frames missing from the atlas are decoded (and scaled) in parallel on the
+    decode pool; conversion to the display format and the colorkey are done
+    here on the calling thread, in order.
+    """
+    names = sorted(os.listdir(BASE_IMG_PATH + path))
+    packed = get_atlas()
+    frames = [packed.image(path + '/' + name, BASE_IMG_PATH + path + '/' + name) if packed else None for name in names]
+    todo = [i for i, img in enumerate(frames) if img is None]
+    pending = {}
+    # with a single core the pool would only add thread hand-offs
+    if DECODE_WORKERS > 1 and len(todo) > 1:
+        pool = get_decode_pool()
+        pending = {i: pool.submit(decode_image, BASE_IMG_PATH + path + '/' + names[i], height) for i in todo}
     images = []
-    for img_name in sorted(os.listdir(BASE_IMG_PATH + path)):
-        images.append(load_image(path + '/' + img_name))
+    for i, img in enumerate(frames):
+        if img is None:
+            decoded = pending[i].result() if i in pending else decode_image(BASE_IMG_PATH + path + '/' + names[i], height)
+            img = decoded.convert()
+        else:
+            img = scale_to_height(img, height)
+        img.set_colorkey((0, 0, 0))
+        images.append(img)
     return images
 
 class Animation:
+    """An animation clip: its frames, ticks per frame and whether it loops.
+
+    Clips are loaded once into Game.assets and shared by everything that
+    shows them, so they are read-only. Where an entity is in a clip is not
+    stored here: an AnimationPlayer keeps the tick it started the clip on
+    and asks for the frame at the ticks elapsed since.
+    """
+    __slots__ = ('images', 'img_duration', 'loop', 'length', 'once_clip')
+
     def __init__(self, images, img_dur=5, loop=True):
-        self.images = images
-        self.loop = loop
-        self.img_duration = img_dur
-        self.done = False
-        self.frame = 0
-    
-    def copy(self):
-        return Animation(self.images, self.img_duration, self.loop)
-    
-    def update(self):
+        init = object.__setattr__
+        init(self, 'images', tuple(images))
+        init(self, 'img_duration', img_dur)
+        init(self, 'loop', loop)
+        # animation frames (ticks) in one pass through the clip
+        init(self, 'length', img_dur * len(self.images))
+        init(self, 'once_clip', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Animation clips are shared and read-only')
+
+    def once(self):
+        """The same frames as a non-looping clip (made on first use and kept)."""
+        if not self.loop:
+            return self
+        if self.once_clip is None:
+            object.__setattr__(self, 'once_clip', Animation(self.images, self.img_duration, loop=False))
+        return self.once_clip
+
+    def frame_at(self, elapsed):
+        """Animation frame after `elapsed` ticks: looping clips wrap, the others stop on the last one."""
         if self.loop:
-            self.frame = (self.frame + 1) % (self.img_duration * len(self.images))
-        else:
-            self.frame = min(self.frame + 1, self.img_duration * len(self.images) - 1)
-            if self.frame >= self.img_duration * len(self.images) - 1:
-                self.done = True
-    
-    def img(self):
-        return self.images[int(self.frame / self.img_duration)]
+            return elapsed % self.length
+        return max(0, min(elapsed, self.length - 1))
+
+    def done_at(self, elapsed):
+        return not self.loop and elapsed >= self.length - 1
+
+    def img(self, elapsed=0):
+        return self.images[int(self.frame_at(elapsed) / self.img_duration)]
+
+class AnimationPlayer:
+    """Playback state for a shared Animation: the clip and the Game.tick it started on.
+
+    Needs self.game. Starting a clip stores two values and creates nothing,
+    and the frame shown follows from the global tick.
+    """
+    animation = None
+    anim_start = 0
+
+    def play(self, clip):
+        """Show clip from its first frame."""
+        self.animation = clip
+        self.anim_start = self.game.tick
+
+    def anim_elapsed(self):
+        return self.game.tick - self.anim_start
+
+    def anim_frame(self):
+        return self.animation.frame_at(self.anim_elapsed())
+
+    def anim_done(self):
+        return self.animation.done_at(self.anim_elapsed())
+
+    def anim_img(self):
+        return self.animation.img(self.anim_elapsed())
 
 
 def bottom_nontransparent_row(surf):
@@ -43,38 +202,14 @@ def bottom_nontransparent_row(surf):
 
     Uses the surface colorkey when present; otherwise falls back to alpha channel
     or non-black pixels. Returns -1 if the surface is fully transparent/empty.
+    For frames loaded through Game.assets prefer assets.frame_metrics(), which
+    caches the result on disk.
     """
     try:
-        w, h = surf.get_width(), surf.get_height()
+        return surface_metrics(surf)['bottom']
     except Exception:
         return -1
 
-    colorkey = None
-    try:
-        colorkey = surf.get_colorkey()
-    except Exception:
-        colorkey = None
-
-    for y in range(h - 1, -1, -1):
-        for x in range(w):
-            try:
-                c = surf.get_at((x, y))
-            except Exception:
-                continue
-            # c may be (r,g,b) or (r,g,b,a)
-            if colorkey is not None:
-                if c[:3] != colorkey:
-                    return y
-            else:
-                if len(c) == 4:
-                    if c[3] != 0:
-                        return y
-                else:
-                    # no alpha channel - treat pure black as transparent (consistent with set_colorkey usage)
-                    if c[:3] != (0, 0, 0):
-                        return y
-    return -1
-
 
 def baseline_from_bottom(surf):
     """Return number of transparent pixels at bottom of the surface.
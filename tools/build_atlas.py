@@ -0,0 +1,30 @@
+"""
+Pack the sprites under data/images into atlas pages (data/atlas/*.png) plus
+an index (data/atlas/atlas.json), see scripts/atlas.py.
+
+load_image/load_images then cut frames out of the pages instead of opening
+and decoding one file per frame. Frames whose source file changed after the
+atlas was built are read from disk again, so re-run this after editing art.
+
+Usage (from the project root):
+    python tools/build_atlas.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from scripts.atlas import ATLAS_DIR, build_atlas
+from scripts.utils import BASE_IMG_PATH
+
+def main():
+    pygame.display.init()
+    # frames are stored after convert(), which needs a display mode
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    index = build_atlas(BASE_IMG_PATH)
+    print(f"{ATLAS_DIR}: {len(index['frames'])} frames on {len(index['pages'])} pages")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+"""
+Generate data/assets.json, the asset manifest Game.assets is built from (see scripts/assets.py).
+
+Run it again after adding art folders (e.g. a new character under
+data/images/entities). The game also rescans on its own when the manifest
+is missing or one of the folders it was built from has changed.
+
+Usage (from the project root):
+    python tools/build_manifest.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.assets import MANIFEST_PATH, build_manifest, write_manifest
+
+def main():
+    manifest = build_manifest()
+    write_manifest(manifest)
+    print(f"{MANIFEST_PATH}: {len(manifest['assets'])} assets, {len(manifest['characters'])} characters")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Check that the pre-composited cloud layers (scripts/clouds.py) draw the
+same pixels as tiling each layer's whole strip 2x2 around its wrap origin,
+for a range of camera offsets and drift positions.
+
+Exits with status 1 on the first mismatch.
+
+Usage (from the project root):
+    python tools/check_clouds.py
+    python tools/check_clouds.py --seed 7 --count 64 --layers 4
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from scripts.clouds import Clouds, VIEW_SIZE
+from scripts.headless import init_headless
+from scripts.utils import load_images
+
+OFFSETS = [(0, 0), (37, 11), (-90, 45), (161, -203), (1234, 567), (-4321, -98), (375, 260), (-1, -1)]
+
+def reference(layer, offset):
+    """The layer drawn the plain way: the full strip blitted at each wrapped position."""
+    pw, ph = layer.period
+    x = int((layer.drift - offset[0] * layer.depth) % pw)
+    y = int((-offset[1] * layer.depth) % ph)
+    surf = pygame.Surface(VIEW_SIZE, pygame.SRCALPHA)
+    surf.fill((0, 0, 0, 0))
+    for tx in (x - pw, x):
+        for ty in (y - ph, y):
+            surf.blit(layer.strip, (tx, ty))
+    return surf
+
+def main(args):
+    seed = int(args[args.index('--seed') + 1]) if '--seed' in args else 1
+    count = int(args[args.index('--count') + 1]) if '--count' in args else 16
+    layers = int(args[args.index('--layers') + 1]) if '--layers' in args else 3
+    init_headless()
+    pygame.display.set_mode(VIEW_SIZE)
+    random.seed(seed)
+    clouds = Clouds(load_images('clouds'), count=count, layers=layers)
+    checked = 0
+    for layer in clouds.layers:
+        for step in range(3):
+            for offset in OFFSETS:
+                surf = pygame.Surface(VIEW_SIZE, pygame.SRCALPHA)
+                surf.fill((0, 0, 0, 0))
+                layer.render(surf, offset=offset)
+                if pygame.image.tobytes(surf, 'RGBA') != pygame.image.tobytes(reference(layer, offset), 'RGBA'):
+                    print(f"mismatch: depth {layer.depth:.2f}, drift {layer.drift:.2f}, offset {offset}")
+                    sys.exit(1)
+                checked += 1
+            layer.drift += 97.3
+    print(f"{checked} renders of {len(clouds.layers)} layers match the wrapped strip")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,34 @@
+"""
+Convert JSON maps in data/maps to the binary .bmap format (see scripts/mapformat.py).
+
+Usage (from the project root):
+    python tools/convert_maps.py            # convert every data/maps/*.json
+    python tools/convert_maps.py 0.json 3   # convert only the given maps
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.mapformat import MAP_EXT
+from scripts.tilemap import Tilemap
+
+MAP_DIR = os.path.join('data', 'maps')
+
+def convert(json_path):
+    tilemap = Tilemap(None)
+    tilemap.load(json_path)
+    out_path = os.path.splitext(json_path)[0] + MAP_EXT
+    tilemap.save(out_path)
+    print(f"{json_path} ({os.path.getsize(json_path)} bytes) -> {out_path} ({os.path.getsize(out_path)} bytes)")
+
+def main(args):
+    if args:
+        names = [a if a.endswith('.json') else a + '.json' for a in args]
+    else:
+        names = sorted(f for f in os.listdir(MAP_DIR) if f.lower().endswith('.json'))
+    for name in names:
+        convert(os.path.join(MAP_DIR, name))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
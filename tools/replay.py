@@ -0,0 +1,42 @@
+"""
+Replay a session recorded with `python game.py --record session.json`,
+headless and as fast as the CPU allows (see scripts/replay.py).
+
+The replay is checked tick for tick against the snapshots stored in the
+recording, and the time it took is reported, so the same recording can be
+used to compare the update path of two builds.
+
+Usage (from the project root):
+    python tools/replay.py session.json
+    python tools/replay.py session.json --runs 5
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import Game
+from scripts.replay import load_replay, play_replay
+
+def main(args):
+    path = args[0]
+    runs = int(args[args.index('--runs') + 1]) if '--runs' in args else 1
+    replay = load_replay(path)
+    game = Game(headless=True)
+    failed = False
+    for run in range(runs):
+        start = time.perf_counter()
+        ticks, mismatches = play_replay(game, replay)
+        elapsed = time.perf_counter() - start
+        print(f"run {run + 1}: {ticks}/{replay['ticks']} ticks in {elapsed:.3f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s), "
+              f"{'in sync' if not mismatches else 'DESYNC'}")
+        for recorded, replayed in mismatches[:1]:
+            print(f"  first mismatch (tick, level, x, y, hits, enemies): recorded {recorded}, replayed {replayed}")
+        failed = failed or bool(mismatches)
+    game.level_loader.shutdown()
+    game.assets.shutdown()
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,61 @@
+"""
+Run the game headless (no window, audio or frame cap) for a number of ticks
+and report how fast the update path ran and where the run ended up.
+
+Input is either nothing (the player stands still) or a JSON script of
+[tick, "down" | "up", key name] entries, see scripts/headless.py.
+
+Usage (from the project root):
+    python tools/simulate.py                              # 3600 ticks on the first map
+    python tools/simulate.py 7200 --level 2 --input run_right.json
+    python tools/simulate.py 3600 --character player_samuraicut --runs 5
+    python tools/simulate.py 3600 --profile sim_profile   # per-phase tick timings -> sim_profile.csv/.json
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import Game
+from scripts.headless import load_input_script
+from scripts.profiler import FrameProfiler
+
+def parse_args(args):
+    options = {'ticks': 3600, 'level': 0, 'character': None, 'input': None, 'runs': 1, 'profile': None}
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg.startswith('--'):
+            options[arg[2:]] = args.pop(0)
+        else:
+            options['ticks'] = arg
+    for name in ('ticks', 'level', 'runs'):
+        options[name] = int(options[name])
+    return options
+
+def main(args):
+    options = parse_args(args)
+    game = Game(headless=True)
+    inputs = load_input_script(options['input']) if options['input'] else None
+    if options['profile']:
+        game.profiler = FrameProfiler(history=options['ticks'] * options['runs'], enabled=True)
+    for run in range(options['runs']):
+        game.level = options['level']
+        game.load_level(game.level)
+        if options['character']:
+            game.apply_character_choice(options['character'])
+        start = time.perf_counter()
+        ticks = game.simulate(options['ticks'], inputs)
+        elapsed = time.perf_counter() - start
+        print(f"run {run + 1}: {ticks} ticks in {elapsed:.3f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s), "
+              f"level {game.level}, player hits {game.player.hits}, enemies left {len(game.enemies)}, "
+              f"boss {'defeated' if game.boss_defeated else ('alive' if game.boss else 'none')}")
+    if options['profile']:
+        for path in game.profiler.export(options['profile']):
+            print(f"wrote {path}")
+    game.level_loader.shutdown()
+    game.assets.shutdown()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])